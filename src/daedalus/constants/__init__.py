@@ -63,8 +63,8 @@ EPILOG = (
 DB_NAME = f"MTPDB_v{__version__}.sqlite"
 """Name of the DB file to save as output"""
 
-CACHE_NAME = f"MTPDB_datacache.pickle"
-"""Name of the cache file to use to stash the downloaded data"""
+CACHE_NAME = "MTPDB_datacache"
+"""Name of the cache folder to use to stash the downloaded data"""
 
 THESAURUS_FILE = "thesaurus.csv"
 """Name of the local thesaurus file"""
@@ -122,6 +122,8 @@ GO = {
     # to use BioMart, so i'll do that.
     # The {go_id} term is a comma-delimited list of values, which should be
     # less than 500.
+    # Only the gene IDs are asked for: with uniqueRows, this returns one row
+    # per gene instead of one per gene annotation.
     "query": """<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE Query>
 <Query  virtualSchemaName = "default" formatter = "TSV" header = "1" uniqueRows = "1" count = "" datasetConfigVersion = "0.6" >
@@ -130,7 +132,6 @@ GO = {
 		<Filter name = "biotype" value = "protein_coding"/>
 		<Filter name = "go_parent_term" value = "{go_ids}"/>
 		<Attribute name = "ensembl_gene_id" />
-        <Attribute name = "go_id" />
 	</Dataset>
 </Query>
 """,
@@ -0,0 +1,133 @@
+"""Data derived from the data of the cache hooks, shared by many parsers.
+
+These functions are the "derived" keys of the ResourceCache: they are run once
+per (re)generation of their base key, and their output is cached like the data
+of the hooks. See `ResourceCache` for more.
+"""
+
+import logging
+
+import pandas as pd
+
+from daedalus.retrievers import DataDict
+from daedalus.utils import recast, split_ensembl_id_column
+
+log = logging.getLogger(__name__)
+
+
+def derive_biomart_ids(mart_data: DataDict) -> DataDict:
+    """Normalise the Ensembl IDs of the BioMart data, once for all parsers
+
+    Args:
+        mart_data (DataDict): The data of the "biomart" cache key.
+
+    Returns:
+        DataDict: A DataDict with these frames:
+          - "genes": The unique ENSGs, with ("ensg_version") and without
+            ("ensg") their version, and the version itself ("ensg_version_leaf");
+          - "transcripts": The unique ENSG - ENST pairs, with the ENSTs with
+            ("enst_version") and without ("enst") version, and the version
+            itself ("enst_version_leaf");
+          - "proteins": The "proteins" BioMart frame, with the "enst" and "ensp"
+            columns instead of the versioned IDs;
+          - "gene_names": The "gene_names" BioMart frame, with the "ensg" column
+            instead of the versioned IDs.
+    """
+    log.info("Normalising BioMart IDs...")
+    ids = mart_data["IDs"]
+
+    genes = pd.Series(pd.unique(ids["gene_stable_id_version"]))
+    genes = split_ensembl_id_column(genes)
+
+    pairs = ids[["gene_stable_id_version", "transcript_stable_id_version"]]
+    pairs = pairs.drop_duplicates(keep="first", ignore_index=True)
+    transcripts = split_ensembl_id_column(pairs["transcript_stable_id_version"])
+
+    proteins = recast(
+        mart_data["proteins"],
+        {
+            "transcript_stable_id_version": "enst",
+            "protein_stable_id_version": "ensp",
+            "pdb_id": None,
+            "refseq_mrna_id": None,
+            "refseq_peptide_id": None,
+        },
+    )
+    for col in ["enst", "ensp"]:
+        proteins[col] = split_ensembl_id_column(proteins[col])["full_id_no_version"]
+
+    gene_names = recast(
+        mart_data["gene_names"],
+        {
+            "gene_stable_id_version": "ensg",
+            "hgnc_symbol": None,
+            "hgnc_id": None,
+            "gene_description": None,
+        },
+    )
+    gene_names["ensg"] = split_ensembl_id_column(gene_names["ensg"])[
+        "full_id_no_version"
+    ]
+
+    return {
+        "genes": pd.DataFrame(
+            {
+                "ensg_version": genes["full_id"],
+                "ensg": genes["full_id_no_version"],
+                "ensg_version_leaf": genes["version_number"],
+            }
+        ),
+        "transcripts": pd.DataFrame(
+            {
+                "ensg": split_ensembl_id_column(pairs["gene_stable_id_version"])[
+                    "full_id_no_version"
+                ],
+                "enst": transcripts["full_id_no_version"],
+                "enst_version": transcripts["full_id"],
+                "enst_version_leaf": transcripts["version_number"],
+            }
+        ),
+        "proteins": proteins,
+        "gene_names": gene_names,
+    }
+
+
+def derive_iuphar_ensg(iuphar: DataDict) -> pd.DataFrame:
+    """Map the IUPHAR object IDs to the (human) ENSGs of their genes
+
+    Args:
+        iuphar (DataDict): The data of the "iuphar" cache key.
+
+    Returns:
+        pd.DataFrame: A frame with the "ensg" column, indexed by the (integer)
+        "object_id", sorted. An object might have more than one ENSG.
+    """
+    log.info("Mapping IUPHAR object IDs to ENSGs...")
+    links = iuphar["database_link"]
+    # Database n. 15 is Ensembl, and species n. 1 is human
+    links = links.loc[(links["database_id"] == "15") & (links["species_id"] == "1")]
+    links = recast(links, {"object_id": None, "placeholder": "ensg"})
+    links = links.dropna().drop_duplicates()
+
+    links["object_id"] = links["object_id"].astype("int64")
+    return links.set_index("object_id").sort_index()
+
+
+def join_iuphar_ensg(
+    data: pd.DataFrame, iuphar_ensg: pd.DataFrame, how: str = "inner"
+) -> pd.DataFrame:
+    """Add the ENSGs of the IUPHAR objects in a frame
+
+    Args:
+        data (pd.DataFrame): A frame with an "object_id" column. The IDs are
+          cast to integers, if they are not already.
+        iuphar_ensg (pd.DataFrame): The data of the "iuphar_ensg" cache key
+          (see `derive_iuphar_ensg`).
+        how (str, optional): The type of merge to do. Defaults to "inner".
+
+    Returns:
+        pd.DataFrame: The frame, with the "ensg" column added.
+    """
+    data = data.assign(object_id=data["object_id"].astype("int64"))
+    merged = data.merge(iuphar_ensg, how=how, left_on="object_id", right_index=True)
+    return merged.reset_index(drop=True)
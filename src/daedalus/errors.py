@@ -4,6 +4,12 @@ class CacheKeyError(Exception):
     pass
 
 
+class CacheMutationError(Exception):
+    """Data handed out by a ResourceCache was changed in place"""
+
+    pass
+
+
 class Abort(Exception):
     """The program cannot continue, but the error was caught, logged, and we can exit gracefully."""
 
@@ -0,0 +1,365 @@
+"""Indexes of the database, and an advisor to check them against a workload.
+
+The indexes are declared as `IndexSpec`s: single-column indexes on every ID
+column (see `ID_COLUMNS`), plus the composite ones in `INDEXES`. The advisor
+(`advise_indexes`) runs a workload of representative queries under
+`EXPLAIN QUERY PLAN`, flags the ones that scan whole tables, and looks for
+indexes that would avoid the scans.
+"""
+
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from logging import getLogger
+from sqlite3 import Connection
+from typing import Optional
+
+from daedalus.utils import get_local_text
+
+log = getLogger(__name__)
+
+WORKLOAD_FILE = "workload.sql"
+
+# fmt: off
+ID_COLUMNS = [
+    "ensg", "ensp", "hugo_gene_id", "target_id", "ligand_id", "family_id",
+    "enst", "refseq_transcript_id", "pdb_id",
+    "tcid_family", "tcid", "tcid_type", "tcid_subtype",
+    "enst_version",
+]
+# fmt: on
+"""Columns that get an index in every table that they are in"""
+
+# Keywords that can follow a table name in a FROM or JOIN clause
+# fmt: off
+_NOT_ALIASES = {
+    "where", "join", "inner", "left", "right", "full", "cross", "natural",
+    "on", "using", "group", "order", "limit", "union", "except", "intersect",
+}
+# fmt: on
+_TABLE_MATCHER = re.compile(r"\b(?:from|join)\s+(\w+)(?:\s+(?:as\s+)?(\w+))?", re.I)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """Dataclass representing an index on one or more columns of a table.
+
+    The first columns should be the ones that are filtered on. The others make
+    the index "covering" for queries that only need those columns.
+    """
+
+    table: str
+    columns: tuple[str, ...]
+
+    @property
+    def name(self) -> str:
+        """The name of the index, e.g. 'channels_carried_solute_ensg_index'"""
+        return f"{self.table}_{'_'.join(self.columns)}_index"
+
+    @property
+    def statement(self) -> str:
+        """The statement that creates this index"""
+        columns = ", ".join(f'"{x}"' for x in self.columns)
+        return (
+            f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" ({columns});'
+        )
+
+
+INDEXES = [
+    IndexSpec("channels", ("carried_solute", "ensg")),
+    IndexSpec("channels", ("gating_mechanism", "ensg")),
+    IndexSpec("solute_carriers", ("carried_solute", "ensg")),
+    IndexSpec("pumps", ("carried_solute", "ensg")),
+    IndexSpec("ABC_transporters", ("carried_solute", "ensg")),
+    IndexSpec("origin", ("tissue", "ensg")),
+]
+"""Composite indexes for the columns that are most often filtered on"""
+
+
+@dataclass
+class QueryAdvice:
+    """Dataclass with the outcome of the advisor for a query of the workload."""
+
+    query: str
+    scans: list[str]
+    """The tables that the query scans in full"""
+    indexes: list[IndexSpec] = field(default_factory=list)
+    """Indexes that would avoid (some of) the scans"""
+
+
+def get_tables(connection: Connection) -> dict[str, list[str]]:
+    """Get the columns of all tables in a database
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+
+    Returns:
+        dict[str, list[str]]: The column names of each table, by table name.
+    """
+    tables = connection.execute(
+        "SELECT name FROM sqlite_schema WHERE type = 'table'"
+        " AND name NOT LIKE 'sqlite_%';"
+    ).fetchall()
+
+    return {
+        table: [
+            x[0]
+            for x in connection.execute(
+                "SELECT name FROM pragma_table_info(?);", (table,)
+            ).fetchall()
+        ]
+        for (table,) in tables
+    }
+
+
+def is_indexed(connection: Connection, spec: IndexSpec) -> bool:
+    """Check if an existing index already serves the same purpose as an IndexSpec
+
+    That is, if there is an index whose first columns are the columns of the spec.
+    Implicit indexes (for PRIMARY KEY and UNIQUE columns) count too.
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+        spec (IndexSpec): The index to look for.
+
+    Returns:
+        bool: True if the spec is redundant.
+    """
+    indexes = connection.execute(
+        "SELECT name FROM pragma_index_list(?);", (spec.table,)
+    ).fetchall()
+    for (index,) in indexes:
+        columns = connection.execute(
+            "SELECT name FROM pragma_index_info(?) ORDER BY seqno;", (index,)
+        ).fetchall()
+        if tuple(x[0] for x in columns[: len(spec.columns)]) == spec.columns:
+            return True
+    return False
+
+
+def get_index_specs(
+    connection: Connection, id_cols: list[str] = ID_COLUMNS
+) -> list[IndexSpec]:
+    """Get the indexes that should be made in a database
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+        id_cols (list[str], optional): The columns that get an index in every
+          table that they are in. Defaults to `ID_COLUMNS`.
+
+    Returns:
+        list[IndexSpec]: An index for each ID column of each table, followed by
+        the ones in `INDEXES` that are on tables of this database.
+    """
+    tables = get_tables(connection)
+
+    specs = [
+        IndexSpec(table, (col,))
+        for table, columns in tables.items()
+        for col in columns
+        if col in id_cols
+    ]
+    specs.extend(x for x in INDEXES if x.table in tables)
+
+    return specs
+
+
+def create_indexes(connection: Connection, specs: list[IndexSpec]) -> None:
+    """Create indexes in a database, skipping the redundant ones
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+        specs (list[IndexSpec]): The indexes to create.
+    """
+    for spec in specs:
+        if is_indexed(connection, spec):
+            log.debug(f"Skipping index {spec.name}, as it is redundant.")
+            continue
+        log.info(f"Creating index {spec.name}")
+        connection.execute(spec.statement)
+
+    log.info("Finished creating table indexes!")
+
+
+def get_workload() -> list[str]:
+    """Get the bundled workload of representative queries
+
+    Returns:
+        list[str]: The queries in the workload.
+    """
+    sql = get_local_text(WORKLOAD_FILE).read()
+    # Strip the comments, so that they do not end up in the logs
+    sql = "\n".join(x.split("--")[0] for x in sql.splitlines())
+    return [x.strip() for x in sql.split(";") if x.strip()]
+
+
+def find_scans(connection: Connection, query: str) -> list[str]:
+    """Find the tables that a query would scan in full
+
+    Scans of a whole index count too, as they still read every row, and so do
+    transient ("automatic") indexes, as SQLite makes them by scanning the table
+    every time that the query is run.
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+        query (str): The query to check.
+
+    Returns:
+        list[str]: The (unique) names of the tables that are scanned.
+    """
+    tables = get_tables(connection)
+    # The plan uses the aliases of the tables, if they have any
+    names = {x: x for x in tables}
+    for table, alias in _TABLE_MATCHER.findall(query):
+        if alias and alias.lower() not in _NOT_ALIASES:
+            names[alias] = table
+
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+
+    scans = []
+    for *_, detail in plan:
+        words = detail.split()
+        if words[0] not in ("SCAN", "SEARCH") or len(words) < 2:
+            continue
+        table = names.get(words[1])
+        if table is None:
+            # Subqueries, CTEs, constant rows...
+            continue
+        if (words[0] == "SCAN" or "AUTOMATIC" in words) and table not in scans:
+            scans.append(table)
+
+    return scans
+
+
+def get_candidates(
+    query: str, table: str, columns: list[str], specs: list[IndexSpec]
+) -> list[IndexSpec]:
+    """Get the indexes that might avoid a scan of a table in a query
+
+    These are the given specs on the table, plus, for each column of the table
+    that the query mentions, an index on that column, and one on that column
+    followed by all the others that are mentioned (a covering index).
+
+    Args:
+        query (str): The query that scans the table.
+        table (str): The table that is scanned.
+        columns (list[str]): The columns of the table.
+        specs (list[IndexSpec]): Indexes to try first.
+
+    Returns:
+        list[IndexSpec]: The candidate indexes, without duplicates.
+    """
+    words = {x.lower() for x in re.findall(r"\w+", query)}
+    mentioned = [x for x in columns if x.lower() in words]
+
+    candidates = [x for x in specs if x.table == table]
+    for col in mentioned:
+        others = tuple(x for x in mentioned if x != col)
+        candidates.append(IndexSpec(table, (col,)))
+        if others:
+            candidates.append(IndexSpec(table, (col,) + others))
+
+    return list(dict.fromkeys(candidates))
+
+
+def copy_schema(connection: Connection) -> Connection:
+    """Copy the tables and indexes (but not the data) of a database to memory
+
+    Args:
+        connection (Connection): The sqlite connection to copy the schema of.
+
+    Returns:
+        Connection: A connection to the new, in-memory, empty database.
+    """
+    statements = connection.execute(
+        "SELECT sql FROM sqlite_schema WHERE sql IS NOT NULL"
+        " AND name NOT LIKE 'sqlite_%' ORDER BY type DESC;"
+    ).fetchall()
+
+    copy = sqlite3.connect(":memory:", isolation_level=None)
+    # Tables ("table") come before indexes ("index") in the sort above
+    for (statement,) in statements:
+        copy.execute(statement)
+
+    return copy
+
+
+def advise_indexes(
+    connection: Connection,
+    workload: Optional[list[str]] = None,
+    specs: list[IndexSpec] = INDEXES,
+) -> list[QueryAdvice]:
+    """Check which queries of a workload scan whole tables, and how to avoid it
+
+    Each candidate index (see `get_candidates`) is tried on an empty copy of
+    the database, so the (possibly large) indexes are not really built. The
+    smallest candidate that avoids the scan is picked, preferring covering
+    indexes, and a candidate is dropped if an existing index already serves
+    the same purpose.
+
+    Args:
+        connection (Connection): The sqlite connection to the database to check.
+        workload (Optional[list[str]], optional): The queries to check.
+          Defaults to None (the bundled workload, see `get_workload`).
+        specs (list[IndexSpec], optional): Indexes to try first. Defaults to
+          `INDEXES`.
+
+    Returns:
+        list[QueryAdvice]: The advice for each query that scans a table.
+    """
+    workload = get_workload() if workload is None else workload
+    tables = get_tables(connection)
+    advice = []
+
+    copy = copy_schema(connection)
+    try:
+        for query in workload:
+            scans = find_scans(copy, query)
+            if not scans:
+                continue
+
+            result = QueryAdvice(query=query, scans=scans)
+            for table in scans:
+                fixes = []
+                for spec in get_candidates(query, table, tables[table], specs):
+                    if is_indexed(copy, spec):
+                        continue
+                    copy.execute("SAVEPOINT advisor;")
+                    copy.execute(spec.statement)
+                    if table not in find_scans(copy, query):
+                        plan = copy.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+                        covering = any(
+                            f"COVERING INDEX {spec.name}" in x[-1] for x in plan
+                        )
+                        fixes.append((not covering, len(spec.columns), spec))
+                    copy.execute("ROLLBACK TO advisor;")
+                    copy.execute("RELEASE advisor;")
+
+                if fixes:
+                    result.indexes.append(min(fixes, key=lambda x: x[:2])[2])
+
+            advice.append(result)
+    finally:
+        copy.close()
+
+    return advice
+
+
+def apply_advice(connection: Connection, advice: list[QueryAdvice]) -> None:
+    """Log the advice of `advise_indexes` and create the indexes it proposes
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+        advice (list[QueryAdvice]): The advice to apply.
+    """
+    for item in advice:
+        query = " ".join(item.query.split())
+        if not item.indexes:
+            log.info(f"No index avoids scanning {item.scans} in query: {query}")
+            continue
+        for spec in item.indexes:
+            log.warning(
+                f"Query scans table {spec.table} without index {spec.columns}."
+                f" Creating it (consider adding it to INDEXES). Query: {query}"
+            )
+            connection.execute(spec.statement)
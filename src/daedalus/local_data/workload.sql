@@ -0,0 +1,62 @@
+-- A representative workload of queries run on the MTP-DB.
+-- It is used by the index advisor (daedalus/indexes.py) to find the queries
+-- that need a full table scan. Queries are separated by semicolons, so
+-- comments should not have any.
+
+-- All GAP junctions (see HOW_TO.md)
+SELECT ensg
+FROM gene_names
+WHERE
+    hugo_gene_symbol LIKE 'GJ%' OR
+    hugo_gene_symbol LIKE 'PANX%';
+
+-- Channels by carried solute or gating mechanism
+SELECT ensg FROM channels WHERE carried_solute = 'Ca2+';
+
+SELECT ensg, carried_solute FROM channels WHERE gating_mechanism = 'voltage';
+
+-- Transporters by carried solute
+SELECT ensg FROM solute_carriers WHERE carried_solute = 'Na+';
+
+SELECT ensg FROM pumps WHERE carried_solute = 'Na+';
+
+SELECT ensg FROM ABC_transporters WHERE carried_solute = 'Cl-';
+
+-- Expression of the genes in a tissue
+SELECT ensg, cell_type, expression_level FROM origin WHERE tissue = 'liver';
+
+-- Names of the channels of a solute
+SELECT gene_names.hugo_gene_symbol, channels.gating_mechanism
+FROM channels
+    JOIN gene_names ON channels.ensg = gene_names.ensg
+WHERE channels.carried_solute = 'K+';
+
+-- Channels expressed in a tissue
+SELECT DISTINCT channels.ensg, channels.carried_solute
+FROM origin
+    JOIN channels ON origin.ensg = channels.ensg
+WHERE origin.tissue = 'kidney';
+
+-- Genes in a TCDB family
+SELECT transcript_ids.ensg, tcdb_ids.tcid
+FROM tcdb_ids
+    JOIN protein_ids ON tcdb_ids.ensp = protein_ids.ensp
+    JOIN transcript_ids ON protein_ids.enst = transcript_ids.enst
+WHERE tcdb_ids.tcid_family = '1.A.1';
+
+-- Ligands of the IUPHAR targets of a gene
+SELECT iuphar_ligands.ligand_name, iuphar_interaction.ligand_action
+FROM iuphar_targets
+    JOIN iuphar_interaction ON iuphar_targets.target_id = iuphar_interaction.target_id
+    JOIN iuphar_ligands ON iuphar_interaction.ligand_id = iuphar_ligands.ligand_id
+WHERE iuphar_targets.ensg = 'ENSG00000006071';
+
+-- Tumor types of a gene
+SELECT tumor_type, is_hallmark FROM cosmic_genes WHERE ensg = 'ENSG00000006071';
+
+-- Functions and structures of the transporters
+SELECT function.physiological_function, structure.membrane_passes
+FROM solute_carriers
+    JOIN function ON solute_carriers.ensg = function.ensg
+    JOIN structure ON solute_carriers.ensg = structure.ensg
+WHERE solute_carriers.carried_solute = 'glucose';
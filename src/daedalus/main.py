@@ -8,7 +8,7 @@ from time import sleep
 
 from daedalus.constants import CACHE_NAME, DB_NAME, DESCRIPTION, EPILOG
 from daedalus.errors import Abort
-from daedalus.make_db import generate_database
+from daedalus.make_db import BUILD_LOCATIONS, generate_database
 from daedalus.utils import make_cosmic_hash
 
 log = logging.getLogger(__name__)
@@ -52,8 +52,70 @@ def main():
     )
     parser.add_argument(
         "--regen-cache",
+        nargs="?",
+        const="all",
+        default=None,
+        help=(
+            "If passed, deletes the cache (if found) before running, regenerating it."
+            " Optionally, a comma-delimited string of cache keys (e.g. 'biomart,GO')"
+            " to regenerate just those."
+        ),
+    )
+    parser.add_argument(
+        "--download-jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of cache hooks to download at the same time when (re)generating"
+            " the cache. Defaults to 1 (one after the other)."
+        ),
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help=(
+            "Number of runners (parsers) to run at the same time, each in its own"
+            " process. Defaults to 1 (one after the other)."
+        ),
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=int,
+        default=None,
+        help=(
+            "Memory budget (in MiB) for the cached data. Over it, the least recently"
+            " used data is dropped from memory, and loaded again from disk if needed."
+            " Defaults to no limit."
+        ),
+    )
+    parser.add_argument(
+        "--strict-cache",
         action="store_true",
-        help="If passed, deletes the cache (if found) before running, regenerating it.",
+        help=(
+            "If passed, checks after each runner that it did not change the cached"
+            " data in place. Slower, useful to debug parsers."
+        ),
+    )
+    parser.add_argument(
+        "--no-bulk-build",
+        action="store_true",
+        help=(
+            "If passed, loads the data with the default (durable, but slower) SQLite"
+            " settings instead of the bulk-loading ones."
+        ),
+    )
+    parser.add_argument(
+        "--build-in",
+        choices=BUILD_LOCATIONS,
+        default="tempfile",
+        help=(
+            "Where to build the database before moving it to the output directory."
+            " With 'tempfile' (the default) or 'memory', an existing database is"
+            " replaced only once the new one is complete. With 'place' the database"
+            " is built directly in the output directory."
+        ),
     )
     parser.add_argument(
         "--skip",
@@ -104,14 +166,30 @@ def main():
 
     if (out_dir / DB_NAME).exists() and args.overwrite:
         # The "and args.overwrite" is redundant, but just to be safe...
-        log.warn("Removing existing database in 2 seconds...")
-        sleep(2)
-        os.remove(out_dir / DB_NAME)
+        if args.build_in == "place":
+            log.warn("Removing existing database in 2 seconds...")
+            sleep(2)
+            os.remove(out_dir / DB_NAME)
+        else:
+            log.warn(
+                "The existing database will be replaced once the new one is built."
+            )
 
-    if out_dir.exists() and (out_dir / CACHE_NAME).exists() and args.regen_cache:
-        log.warn("Removing existing data cache in 5 seconds...")
+    to_regen = args.regen_cache.split(",") if args.regen_cache else []
+    if (out_dir / CACHE_NAME).exists() and to_regen:
+        log.warn(
+            f"Removing existing data cache for '{args.regen_cache}' in 5 seconds..."
+        )
         sleep(5)
-        os.remove(out_dir / CACHE_NAME)
+
+    if args.download_jobs < 1:
+        raise Abort(f"--download-jobs must be at least 1, not {args.download_jobs}.")
+
+    if args.jobs < 1:
+        raise Abort(f"--jobs must be at least 1, not {args.jobs}.")
+
+    if args.max_memory is not None and args.max_memory < 1:
+        raise Abort(f"--max-memory must be at least 1, not {args.max_memory}.")
 
     log.info("Generating database...")
 
@@ -125,6 +203,13 @@ def main():
             to_run=to_run,
             to_skip=to_skip,
             skip_post=args.skip_post,
+            download_jobs=args.download_jobs,
+            to_regen=to_regen,
+            strict_cache=args.strict_cache,
+            max_memory=args.max_memory,
+            runner_jobs=args.jobs,
+            bulk_build=not args.no_bulk_build,
+            build_in=args.build_in,
         )
     except Abort:
         log.error("Abort!")
@@ -1,14 +1,28 @@
 import gc
 import logging
+import multiprocessing
+import os
+import queue
 import sqlite3
 import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from functools import partial
+from itertools import islice
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from sqlite3 import Connection
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Generator, Iterable, Iterator, Optional
 
 from daedalus.constants import CACHE_NAME, DB_NAME
-from daedalus.errors import Abort
+from daedalus.derived import derive_biomart_ids, derive_iuphar_ensg
+from daedalus.errors import Abort, CacheMutationError
+from daedalus.indexes import (
+    advise_indexes,
+    apply_advice,
+    create_indexes,
+    get_index_specs,
+)
 from daedalus.parsers import (
     get_abc_transporters_transaction,
     get_aquaporins_transaction,
@@ -43,13 +57,85 @@ from daedalus.retrievers import (
     retrieve_tcdb,
 )
 from daedalus.utils import (
+    HTTP_POOL_SIZE,
+    TablePayload,
     execute_transaction,
     get_local_post_build_hooks,
     get_local_text,
+    make_session,
+    set_download_store,
+    set_session,
 )
 
 log = logging.getLogger(__name__)
 
+POOL_QUEUED_CHUNKS = 4
+"""Chunks that each runner in the process pool can produce ahead of the writer"""
+
+BUILD_PAGE_SIZE = 16384
+"""Page size (in bytes) of new databases. Must be set before making any table."""
+
+BUILD_PRAGMAS = {
+    # The journal is kept (in memory) so that failed runners can be rolled back
+    "journal_mode": "MEMORY",
+    "synchronous": "OFF",
+    # Negative values are in KiB: this is 256 MiB of page cache
+    "cache_size": -262144,
+    "temp_store": "MEMORY",
+}
+"""Pragmas used while loading data. A crash during a build corrupts the db."""
+
+DURABLE_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+}
+"""Pragmas restored once the database is built, before it is vacuumed."""
+
+
+def set_pragmas(connection: Connection, pragmas: dict) -> None:
+    """Set a series of pragmas on a connection
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+        pragmas (dict): The pragmas to set, as name: value.
+    """
+    for name, value in pragmas.items():
+        log.debug(f"Setting pragma {name} to {value}")
+        # `journal_mode` returns the new mode, so the cursor must be consumed
+        connection.execute(f"PRAGMA {name} = {value};").fetchall()
+
+
+def set_build_mode(connection: Connection) -> None:
+    """Prepare a new, empty database for bulk loading
+
+    The page size can only be changed before any table is made, so this has
+    to be called before `make_empty`.
+
+    Args:
+        connection (Connection): The sqlite connection to use.
+    """
+    set_pragmas(connection, {"page_size": BUILD_PAGE_SIZE})
+    set_pragmas(connection, BUILD_PRAGMAS)
+
+
+def finalize_database(connection: Connection) -> None:
+    """Restore the durable settings of a database, then optimize it
+
+    Runs ANALYZE, so that the query planner has statistics on the new indexes,
+    and VACUUM, to defragment the file after the bulk load.
+
+    Args:
+        connection (Connection): The sqlite connection to use. Must not be in a
+          transaction.
+    """
+    log.info("Analyzing database...")
+    connection.execute("ANALYZE;")
+
+    set_pragmas(connection, DURABLE_PRAGMAS)
+
+    log.info("Vacuuming database...")
+    connection.execute("VACUUM;")
+
 
 def make_empty(connection: Connection) -> None:
     """Run the db schema on a connection
@@ -64,16 +150,43 @@ def make_empty(connection: Connection) -> None:
     connection.executescript(SCHEMA)
 
 
+BUILD_LOCATIONS = ("tempfile", "memory", "place")
+"""Where the database can be built (see `generate_database`)"""
+
+
+def save_database(connection: Connection, path: Path) -> None:
+    """Copy the database of a connection to a new file, with the backup API
+
+    Args:
+        connection (Connection): The sqlite connection to copy the database of.
+        path (Path): The path of the new file. Overwritten if it exists.
+    """
+    path.unlink(missing_ok=True)
+    target = sqlite3.connect(path, isolation_level=None)
+    try:
+        set_pragmas(target, DURABLE_PRAGMAS)
+        connection.backup(target)
+    finally:
+        target.close()
+
+
 def generate_database(
     path: Path,
     auth_hash: Optional[str],
     to_run: list[str] = [],
     to_skip: list[str] = [],
     skip_post: bool = False,
+    download_jobs: int = 1,
+    to_regen: list[str] = [],
+    strict_cache: bool = False,
+    max_memory: Optional[int] = None,
+    runner_jobs: int = 1,
+    bulk_build: bool = True,
+    build_in: str = "tempfile",
 ) -> None:
     """Generate the database - downloading and parsing all the data.
 
-    Fails if a db already exist in the target path.
+    If building in place, fails if a db already exist in the target path.
 
     Args:
         path (Path): The path to generate the database to. Has to point to a folder.
@@ -84,14 +197,49 @@ def generate_database(
         to_run (Optional[list[str]]): Passed to `populate_database`.
         to_skip (Optional[list[str]]): Passed to `populate_database`.
         skip_post (Optional[bool]): If specified, does not apply post-build hooks.
+        download_jobs (int): How many cache hooks to retrieve concurrently if the
+            cache has to be (re)generated. Defaults to 1 (sequential).
+        to_regen (list[str]): Cache keys to drop and retrieve again. If it
+            contains "all", the whole cache is regenerated.
+        strict_cache (bool): If True, check after each runner that the cached
+            data was not changed in place, aborting if it was. Slower.
+        max_memory (Optional[int]): Memory budget (in MiB) for the cached data.
+            Over it, the least recently used data is dropped from memory, to
+            be loaded again from disk if needed. Defaults to None (no limit).
+        runner_jobs (int): How many runners to run concurrently. Defaults to 1.
+        bulk_build (bool): If True (the default), load the data with fast but
+            unsafe settings (see `set_build_mode`), then restore the durable
+            ones. Either way, the database is analyzed and vacuumed at the end.
+        build_in (str): Where to build the database. With "tempfile" (the
+            default) it is built in a temporary file next to the final one, and
+            with "memory" in an in-memory database that is then copied to a
+            temporary file. Either way, the temporary file is then renamed over
+            the final one, so that it is never seen half-built, and an existing
+            database is replaced only then. With "place" it is built directly
+            in the final file, that must not exist.
     """
     log.info("Making new database.")
 
     database_path = path / DB_NAME
+    # The rename is atomic only if the temporary file is on the same filesystem
+    temp_path = path / f"{DB_NAME}.tmp"
+    if build_in != "place":
+        # It can be left over by a previous, failed build
+        temp_path.unlink(missing_ok=True)
+
+    build_path = {
+        "tempfile": temp_path,
+        "memory": ":memory:",
+        "place": database_path,
+    }[build_in]
+
+    log.info(f"Connecting to empty database ({build_in})...")
+    connection = sqlite3.connect(build_path, isolation_level=None)
+    if bulk_build:
+        set_build_mode(connection)
 
     log.info("Executing schema...")
-    with sqlite3.connect(database_path) as connection:
-        make_empty(connection)
+    make_empty(connection)
 
     cache_hooks = {
         "iuphar": retrieve_iuphar,
@@ -112,17 +260,36 @@ def generate_database(
             "Skipped adding COSMIC data, but the 'cosmic' parser is missing. This might lead to errors."
         )
 
-    cache = ResourceCache(cache_path=(path / CACHE_NAME), hooks=cache_hooks)
+    # Raw downloads are kept even if the cache is regenerated, so that
+    # unchanged upstream files need not be downloaded again.
+    set_download_store(path / CACHE_NAME / "downloads")
+    # Every concurrent retriever needs its own connection
+    set_session(make_session(pool_size=max(HTTP_POOL_SIZE, download_jobs)))
+
+    # Data computed from the data of the hooks, shared by many parsers
+    derived_hooks = {
+        "biomart_ids": ("biomart", derive_biomart_ids),
+        "iuphar_ensg": ("iuphar", derive_iuphar_ensg),
+    }
 
-    # I force here the cache to repopulate - just for clarity
-    # It would be populated automatically later, as soon as it was used.
-    cache.populate()
+    cache = ResourceCache(
+        cache_path=(path / CACHE_NAME),
+        hooks=cache_hooks,
+        derived=derived_hooks,
+        download_jobs=download_jobs,
+        strict=strict_cache,
+        max_memory=max_memory * 1024 * 1024 if max_memory else None,
+    )
 
-    log.info("Connecting to empty database...")
-    connection = sqlite3.connect(database_path, isolation_level=None)
+    if "all" in to_regen:
+        to_regen = list(cache_hooks.keys())
+    if to_regen:
+        cache.invalidate(to_regen)
 
     log.info("Populating database with data...")
-    populate_database(connection, cache, to_skip=to_skip, to_run=to_run)
+    populate_database(
+        connection, cache, to_skip=to_skip, to_run=to_run, jobs=runner_jobs
+    )
 
     if not skip_post:
         log.info("Running manual tweaks...")
@@ -130,38 +297,23 @@ def generate_database(
     else:
         log.info("Post-build hooks not applied following user flag.")
 
-    log.info("Creating indexes on ID columns...")
-    # I programmatically create indexes just to be faster
-    id_cols = [
-        "ensg", "ensp", "hugo_gene_id", "target_id", "ligand_id", "family_id",
-        "enst", "refseq_transcript_id", "pdb_id",
-        "tcid_family", "tcid", "tcid_type", "tcid_subtype",
-        "enst_version"
-    ]
-    create_indexes(connection, id_cols)
+    log.info("Creating indexes...")
+    create_indexes(connection, get_index_specs(connection))
+
+    log.info("Checking the indexes against the query workload...")
+    apply_advice(connection, advise_indexes(connection))
+
+    finalize_database(connection)
+
+    if build_in == "memory":
+        log.info("Saving database to disk...")
+        save_database(connection, temp_path)
 
     connection.close()
-    log.info(f"Finished populating database. Saved in {database_path}")
 
-def create_indexes(connection: Connection, id_cols: list[str]):
-    template = 'CREATE INDEX "{table_name}_{col}_index" ON "{table_name}" ("{col}");'
-    
-    log.info("Getting all table names...")
-    table_names = connection.execute("SELECT name FROM pragma_table_list();").fetchall()
-    table_names = [x[0] for x in table_names] # These are nested tuples
-    
-    for table in table_names:
-        table_cols = connection.execute(f"SELECT name FROM pragma_table_info('{table}');").fetchall()
-        table_cols = [x[0] for x in table_cols]
-        index_cols = [x for x in table_cols if x in id_cols]
-        if not index_cols:
-            continue
-        for col in index_cols:
-            log.info(f"Creating a new index on table {table} with col {col}")
-            transaction = template.format(table_name = table, col = col)
-            execute_transaction(connection, transaction)
-    
-    log.info("Finished creating table indexes!")
+    if build_in != "place":
+        os.replace(temp_path, database_path)
+    log.info(f"Finished populating database. Saved in {database_path}")
 
 def check_changes(connection: Connection) -> bool:
     """Check if anything has been affected by the last transaction"""
@@ -193,26 +345,165 @@ def apply_manual_tweaks(connection: Connection):
                 log.warn(f"Post-build hook {name} [{i + 1}] did not affect the database.")
 
 
-class Daedalus:
-    def __init__(self, connection: Connection, cache: ResourceCache) -> None:
-        self.connection: Connection = connection
+def get_wrapper(
+    getter: Callable,
+    cache: ResourceCache,
+    cache_args: dict,
+    other_args: dict = None,
+) -> Any:
+    """Wraps a get_x_transaction function to call the cache when appropriate
+
+    It lives at the module level so that the runners that use it can be sent
+    to worker processes (see `Daedalus.run`).
+
+    The cache keys are released (see `ResourceCache.release`) once the getter
+    is done with them: when it returns, or, if it yields its output in chunks,
+    when they are all used (or the generator is closed).
+
+    Raises:
+        CacheMutationError: If the cache is in strict mode, and the getter
+          changed the cached data in place.
+    """
+    keys = list(dict.fromkeys(cache_args.values()))
+    try:
+        cached_data = {}
+        for key, value in cache_args.items():
+            with cache(value) as data:
+                cached_data[key] = data
+
+        if other_args:
+            cached_data.update(other_args)
+
+        transaction = getter(**cached_data)
+    except Exception:
+        cache.release(keys)
+        raise
+
+    if isinstance(transaction, Iterator):
+        # The getter yields its output in chunks, and only runs as they are used
+        return verify_after(transaction, cache, keys)
+
+    try:
+        # In strict mode, check that the getter did not change the data that
+        # the next runners will use
+        cache.verify()
+    finally:
+        cache.release(keys)
+
+    return transaction
+
+
+def verify_after(chunks: Iterator, cache: ResourceCache, keys: list[str]) -> Iterator:
+    """Yield the chunks of a getter, verify the cache, then release the keys
+
+    See `get_wrapper`.
+    """
+    try:
+        yield from chunks
+        cache.verify()
+    finally:
+        cache.release(keys)
+
+
+def init_worker_logging(queue: multiprocessing.Queue, level: int) -> None:
+    """Send the logs of a worker process to the parent (see `Daedalus.run_in_pool`)
+
+    Spawned workers do not inherit the logging setup of the parent, so their
+    logs are put in a queue instead, and the parent handles them with its own
+    handlers.
+
+    Args:
+        queue (multiprocessing.Queue): The queue that the parent listens to.
+        level (int): The level of the "daedalus" logger of the parent.
+    """
+    root = logging.getLogger("daedalus")
+    # Importing daedalus added the default handler, which the parent replaces
+    root.handlers.clear()
+    root.addHandler(QueueHandler(queue))
+    root.setLevel(level)
+    root.propagate = False
+
+
+class EndOfChunks:
+    """Put by `run_in_worker` in its queue once it is done"""
+
+
+def run_in_worker(runner: Callable, chunks: queue.Queue) -> Any:
+    """Run a runner in a worker process (see `Daedalus.run_in_pool`).
+
+    Generators cannot be sent back from worker processes, so the chunks of the
+    runners that yield them are put in a (bounded) queue instead, one at a
+    time, as the parent writes them. An `EndOfChunks` is put in the queue at
+    the end, in any case.
+
+    Args:
+        runner (Callable): The runner to run.
+        chunks (queue.Queue): The queue to put the chunks in.
+
+    Returns:
+        Any: The transaction(s) of the runner, or None if it yields them.
+    """
+    try:
+        transaction = runner()
+        if not isinstance(transaction, Iterator):
+            return transaction
+        for chunk in transaction:
+            chunks.put(chunk)
+        return None
+    finally:
+        chunks.put(EndOfChunks())
+
 
-        def get_wrapper(
-            getter: Callable,
-            cache: ResourceCache,
-            cache_args: dict,
-            other_args: dict = None,
-        ) -> Any:
-            """Wraps a get_x_transaction function to call the cache when appropriate"""
-            cached_data = {}
-            for key, value in cache_args.items():
-                with cache(value) as data:
-                    cached_data[key] = data
+def receive_chunks(first: Any, future: Future, chunks: queue.Queue) -> Iterator:
+    """Yield the chunks that a worker puts in a queue (see `run_in_worker`).
 
-            if other_args:
-                cached_data.update(other_args)
+    Once the worker is done, its errors (if any) are raised.
 
-            return getter(**cached_data)
+    Args:
+        first (Any): The first chunk, already taken from the queue.
+        future (Future): The future of the worker.
+        chunks (queue.Queue): The queue that the worker puts the chunks in.
+
+    Yields:
+        Any: The chunks, in order.
+    """
+    chunk = first
+    try:
+        while not isinstance(chunk, EndOfChunks):
+            yield chunk
+            chunk = get_chunk(future, chunks)
+    finally:
+        # If the chunks are not needed anymore (e.g. writing them failed), the
+        # worker is still let finish, so that it does not wait on a full queue
+        while not isinstance(chunk, EndOfChunks):
+            chunk = get_chunk(future, chunks)
+    future.result()
+
+
+def get_chunk(future: Future, chunks: queue.Queue) -> Any:
+    """Get the next chunk that a worker puts in a queue (see `run_in_worker`).
+
+    Args:
+        future (Future): The future of the worker.
+        chunks (queue.Queue): The queue that the worker puts the chunks in.
+
+    Returns:
+        Any: The chunk, or an `EndOfChunks` if the worker is done. If the
+          worker died before putting one in the queue, an `EndOfChunks` is
+          returned all the same.
+    """
+    while True:
+        try:
+            return chunks.get(timeout=1)
+        except queue.Empty:
+            if future.done() and chunks.empty():
+                return EndOfChunks()
+
+
+class Daedalus:
+    def __init__(self, connection: Connection, cache: ResourceCache) -> None:
+        self.connection: Connection = connection
+        self.cache: ResourceCache = cache
 
         get = partial(get_wrapper, cache=cache)
 
@@ -235,23 +526,23 @@ class Daedalus:
 
         self.runners = {
             "gene_ids": partial(
-                get, get_gene_ids_transaction, cache_args={"mart_data": "biomart"}
+                get, get_gene_ids_transaction, cache_args={"mart_ids": "biomart_ids"}
             ),
             "transcript_ids": partial(
                 get,
                 get_transcripts_ids_transaction,
-                cache_args={"mart_data": "biomart"},
+                cache_args={"mart_ids": "biomart_ids"},
             ),
             "refseq_mrna": partial(
-                get, get_refseq_transaction, cache_args={"mart_data": "biomart"}
+                get, get_refseq_transaction, cache_args={"mart_ids": "biomart_ids"}
             ),
             "protein_structures": partial(
                 get,
                 get_protein_structures_transaction,
-                cache_args={"mart_data": "biomart"},
+                cache_args={"mart_ids": "biomart_ids"},
             ),
             "gene_names": partial(
-                get, get_gene_names_transaction, cache_args={"mart_data": "biomart"}
+                get, get_gene_names_transaction, cache_args={"mart_ids": "biomart_ids"}
             ),
             "iuphar_targets": partial(
                 get,
@@ -271,7 +562,7 @@ class Daedalus:
             "tcdb_ids": partial(
                 get,
                 get_tcdb_ids_transaction,
-                cache_args={"tcdb_data": "tcdb", "mart_data": "biomart"},
+                cache_args={"tcdb_data": "tcdb", "mart_ids": "biomart_ids"},
             ),
             "tcdb_definitions": partial(
                 get, get_tcdb_definitions_transactions, cache_args={"tcdb_data": "tcdb"}
@@ -281,6 +572,7 @@ class Daedalus:
                 get_ion_channels_transaction,
                 cache_args={
                     "iuphar_data": "iuphar",
+                    "iuphar_ensg": "iuphar_ensg",
                     "hugo": "hugo",
                     "iuphar_compiled": "iuphar_compiled",
                     "gene_ontology": "GO",
@@ -289,7 +581,7 @@ class Daedalus:
             "cosmic": partial(
                 get,
                 get_cosmic_transaction,
-                cache_args={"cosmic": "cosmic", "mart_data": "biomart"},
+                cache_args={"cosmic": "cosmic", "mart_ids": "biomart_ids"},
             ),
             "aquaporins": partial(
                 get,
@@ -299,7 +591,12 @@ class Daedalus:
             "solute_carriers": partial(
                 get,
                 get_solute_carriers_transaction,
-                cache_args={"hugo": "hugo", "iuphar": "iuphar", "slc": "slc"},
+                cache_args={
+                    "hugo": "hugo",
+                    "iuphar": "iuphar",
+                    "iuphar_ensg": "iuphar_ensg",
+                    "slc": "slc",
+                },
             ),
             "ABC_transporters": partial(
                 get,
@@ -315,10 +612,14 @@ class Daedalus:
                 get, get_origin_transaction, cache_args={"patlas": "patlas"}
             ),
             "function": partial(
-                get, get_function_transaction, cache_args={"iuphar": "iuphar"}
+                get,
+                get_function_transaction,
+                cache_args={"iuphar": "iuphar", "iuphar_ensg": "iuphar_ensg"},
             ),
             "structure": partial(
-                get, get_structure_transaction, cache_args={"iuphar": "iuphar"}
+                get,
+                get_structure_transaction,
+                cache_args={"iuphar": "iuphar", "iuphar_ensg": "iuphar_ensg"},
             ),
         }
         """A dict with keys arbitrary names for the runners, and for values partial calls to 'get_wrapper'
@@ -326,32 +627,230 @@ class Daedalus:
         In essence, will run all the "get_wrappers" only when "self.run" is called, not before.
         """
 
-    def run(self, to_skip: list[str] = []) -> None:
-        """Run all the getters on the connection"""
-        apply = partial(execute_transaction, connection=self.connection)
+    def runner_keys(self, runner: str) -> list[str]:
+        """Get the cache keys used by a runner.
+
+        Args:
+            runner (str): The name of the runner.
+
+        Returns:
+            list[str]: The cache keys, without duplicates.
+        """
+        # The cache args are the ones that the runner was primed with
+        return list(dict.fromkeys(self.runners[runner].keywords["cache_args"].values()))
+
+    def consumers(self, to_skip: list[str] = []) -> dict[str, int]:
+        """Count how many of the runners that are not skipped use each cache key.
+
+        Args:
+            to_skip (list[str], optional): The runners that will be skipped.
+              Defaults to [].
+
+        Returns:
+            dict[str, int]: The number of consumers of each key, in the order
+              that the keys are first used.
+        """
+        consumers = {}
+        for runner in self.runners:
+            if runner in to_skip:
+                continue
+            for key in self.runner_keys(runner):
+                consumers[key] = consumers.get(key, 0) + 1
+
+        return consumers
+
+    def needed_keys(self, to_skip: list[str] = []) -> list[str]:
+        """Get the cache keys needed by the runners that are not skipped.
+
+        Args:
+            to_skip (list[str], optional): The runners that will be skipped.
+              Defaults to [].
+
+        Returns:
+            list[str]: The needed cache keys, in the order that they are first used.
+        """
+        return list(self.consumers(to_skip))
+
+    def run_here(self, key: str) -> tuple[Any, Optional[tuple[Exception, str]]]:
+        """Run a runner in this process.
+
+        The cache drops the data of each key after its last consumer is done
+        (see `consumers`), so the consumers must be declared first. Runners
+        that yield their output in chunks are only done once it is written
+        (see `write`).
+
+        Args:
+            key (str): The name of the runner to run.
+
+        Returns:
+            tuple[Any, Optional[tuple[Exception, str]]]: The transaction(s) of
+              the runner, and the error that it raised with its traceback, if any.
+        """
+        try:
+            return self.runners[key](), None
+        except Exception as e:
+            return None, (e, traceback.format_exc())
+
+    def run_in_pool(
+        self, selected: list[str], jobs: int
+    ) -> Iterator[tuple[Any, Optional[tuple[Exception, str]]]]:
+        """Run some runners in a pool of worker processes.
+
+        The runners are all independent of each other: they just read from the
+        cache, which is already populated. Each worker loads the data that it
+        needs from the cache on disk. Their logs are handled by the handlers of
+        this process (see `init_worker_logging`).
+
+        At most `jobs` runners are submitted (or done, but not yet taken) at a
+        time: a new one is submitted every time that the outcome of one is
+        taken. The chunks of the runners that yield them are sent back through
+        a queue of at most `POOL_QUEUED_CHUNKS` chunks per runner, so only a
+        few chunks of each runner are in memory at once.
+
+        Args:
+            selected (list[str]): The names of the runners to run.
+            jobs (int): The number of worker processes.
+
+        Yields:
+            tuple[Any, Optional[tuple[Exception, str]]]: The transaction(s) of
+              each runner and the error that it raised with its traceback, if
+              any, in the same order as `selected`.
+        """
+        log.info(f"Running {len(selected)} runners with {jobs} worker processes...")
+        # This process does not need the data anymore, the workers load their own
+        for key in self.needed_keys([x for x in self.runners if x not in selected]):
+            self.cache.drop(key)
+
+        # Workers are spawned, not forked, as this process might have threads
+        context = multiprocessing.get_context("spawn")
+        # The logs of the workers are handled here, by the handlers of this process
+        root = logging.getLogger("daedalus")
+        log_queue = context.Queue()
+        listener = QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+        listener.start()
+        pool = ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=context,
+            initializer=init_worker_logging,
+            initargs=(log_queue, root.level),
+        )
+        # Queues made by a manager can be sent to the workers with the runners
+        manager = context.Manager()
+        pending = deque()
+
+        def submit(key: str) -> None:
+            chunks = manager.Queue(maxsize=POOL_QUEUED_CHUNKS)
+            future = pool.submit(run_in_worker, self.runners[key], chunks)
+            pending.append((future, chunks))
+
+        try:
+            to_submit = iter(selected)
+            for key in islice(to_submit, jobs):
+                submit(key)
+
+            while pending:
+                future, chunks = pending.popleft()
+                # The outcome of a runner is taken, so another can start
+                for key in islice(to_submit, 1):
+                    submit(key)
+
+                first = get_chunk(future, chunks)
+                if not isinstance(first, EndOfChunks):
+                    yield receive_chunks(first, future, chunks), None
+                    continue
+                try:
+                    yield future.result(), None
+                except Exception as e:
+                    yield None, (e, "".join(traceback.format_exception(e)))
+        finally:
+            # Workers still waiting to put chunks in a queue fail once the
+            # manager is gone, so they do not block the shutdown of the pool
+            manager.shutdown()
+            pool.shutdown(cancel_futures=True)
+            listener.stop()
+
+    def write(self, transactions: Iterable) -> None:
+        """Write the transactions of a runner to the database, all or nothing.
+
+        The transactions are written one at a time as they come, so runners
+        that yield their output in chunks only have one chunk in memory.
+
+        Args:
+            transactions (Iterable): The SQL strings or TablePayloads to write.
+        """
+        own_transaction = not self.connection.in_transaction
+        if own_transaction:
+            self.connection.execute("BEGIN")
+        try:
+            for transaction in transactions:
+                execute_transaction(self.connection, transaction)
+        except Exception:
+            if own_transaction:
+                self.connection.execute("ROLLBACK")
+            raise
+        finally:
+            # Let the runners that failed halfway through clean up (see
+            # `get_wrapper`)
+            if isinstance(transactions, Generator):
+                transactions.close()
+        if own_transaction:
+            self.connection.execute("COMMIT")
+
+    def run(self, to_skip: list[str] = [], jobs: int = 1) -> None:
+        """Run all the getters on the connection
+
+        With more than one job, the getters run in a pool of worker processes
+        (see `run_in_pool`). Their transactions are still applied by this
+        process alone, one at a time, in the same order as the runners.
+
+        Args:
+            to_skip (list[str], optional): The runners to skip. Defaults to [].
+            jobs (int, optional): How many runners to run at the same time.
+              Defaults to 1 (one after the other).
+        """
+        selected = [key for key in self.runners if key not in to_skip]
+        if jobs > 1:
+            outcomes = self.run_in_pool(selected, jobs)
+        else:
+            # The cache drops the data of each key after its last consumer is done
+            self.cache.add_consumers(self.consumers(to_skip))
+            outcomes = map(self.run_here, selected)
 
         failed = []
         for i, (key, runner) in enumerate(self.runners.items()):
             i += 1  # To count from 1, not 0
             if key not in to_skip:
                 log.info(f"[ {i} / {len(self.runners)} ] Running {key}")
+                transaction, error = next(outcomes)
+                if error:
+                    e, msg = error
+                    if isinstance(e, CacheMutationError):
+                        log.error(f"Runner '{key}' broke the cache: {e}. Aborting.")
+                        raise Abort
+                    log.error(
+                        f"Runner '{key}' failed with error >> {type(e)} <<. Trying to continue before dumping error info."
+                    )
+                    failed.append((key, e, msg))
+                    continue
+
+                # Some 'get' (namely the TCDB stuff) gives a list of transactions,
+                # and some yield them in chunks, so this is why we have to do this
+                if isinstance(transaction, (str, TablePayload)):
+                    transaction = [transaction]
                 try:
-                    transaction = runner()
+                    self.write(transaction)
+                except CacheMutationError as e:
+                    log.error(f"Runner '{key}' broke the cache: {e}. Aborting.")
+                    raise Abort
                 except Exception as e:
                     log.error(
-                        f"Runner '{key}' failed with error >> {type(e)} <<. Trying to continue before dumping error info."
+                        f"Runner '{key}' failed with error >> {type(e)} << while writing its data. Trying to continue before dumping error info."
                     )
                     failed.append((key, e, traceback.format_exc()))
                     continue
-                # Some 'get' (namely the TCDB stuff) gives a list of transactions,
-                # so this is why we have to do this
-                if isinstance(transaction, list):
-                    for element in transaction:
-                        apply(transaction=element)
-                else:
-                    apply(transaction=transaction)
 
                 log.debug("Taking out the garbage...")
+                del transaction
                 gc.collect()
             else:
                 log.info(f"[ {i} / {len(self.runners)}] Skipped {key}")
@@ -375,6 +874,7 @@ def populate_database(
     cache: ResourceCache,
     to_skip: Optional[list[str]] = None,
     to_run: Optional[list[str]] = None,
+    jobs: int = 1,
 ) -> None:
     """Populate an empty database with data
 
@@ -387,6 +887,7 @@ def populate_database(
           to be skipped. Cannot be passed with "to_run". Defaults to None.
         to_run(Optional[list[str]]): A list of strings of runners that need
           to be run. Cannot be passed with "to_skip". Defaults to None.
+        jobs (int): How many runners to run in parallel. Defaults to 1.
     """
 
     daedalus = Daedalus(connection, cache)
@@ -402,4 +903,9 @@ def populate_database(
     if not to_run and not to_skip:
         to_skip = []
 
-    daedalus.run(to_skip)
+    # I force here the cache to populate, but only with what the runners that
+    # will run need. It would be populated automatically later, as soon as it
+    # was used, but this way the downloads can run concurrently.
+    cache.populate(daedalus.needed_keys(to_skip))
+
+    daedalus.run(to_skip, jobs=jobs)
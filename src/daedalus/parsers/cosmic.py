@@ -3,7 +3,7 @@ from copy import deepcopy
 
 import pandas as pd
 
-from daedalus.utils import lmap, recast, sanity_check, split_ensembl_ids, to_transaction
+from daedalus.utils import recast, sanity_check, to_payload
 
 log = logging.getLogger(__name__)
 
@@ -12,7 +12,7 @@ log = logging.getLogger(__name__)
 # for the database".
 
 
-def get_cosmic_transaction(cosmic, mart_data):
+def get_cosmic_transaction(cosmic, mart_ids):
     # The data is essentially all there, we just need to change its form to
     # be added in the DB as I want it to.
     relevant_data = recast(
@@ -63,18 +63,10 @@ def get_cosmic_transaction(cosmic, mart_data):
     parsed_db = pd.DataFrame(new_db_data)
 
     # Move from hugo symbols to ensg
+    # The ensgs have no version (see `daedalus.derived`)
     symbols = recast(
-        mart_data["gene_names"],
-        {"hgnc_symbol": "hugo_gene_symbol", "gene_stable_id_version": "ensg"},
-    )
-    # purge the version
-    symbols = pd.DataFrame(
-        {
-            "hugo_gene_symbol": symbols["hugo_gene_symbol"],
-            "ensg": lmap(
-                lambda x: split_ensembl_ids(x).full_id_no_version, symbols["ensg"]
-            ),
-        }
+        mart_ids["gene_names"],
+        {"hgnc_symbol": "hugo_gene_symbol", "ensg": "ensg"},
     )
 
     parsed_db = parsed_db.merge(symbols, how="inner", on="hugo_gene_symbol")
@@ -90,4 +82,4 @@ def get_cosmic_transaction(cosmic, mart_data):
     # We don't need the gene symbols anymore
     parsed_db = parsed_db.drop(columns=["hugo_gene_symbol"])
 
-    return to_transaction(parsed_db.drop_duplicates(), "cosmic_genes")
+    return to_payload(parsed_db.drop_duplicates(), "cosmic_genes")
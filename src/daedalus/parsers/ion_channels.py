@@ -6,12 +6,13 @@ from statistics import mean
 import numpy as np
 import pandas as pd
 
+from daedalus.derived import join_iuphar_ensg
 from daedalus.utils import (
     apply_thesaurus,
     is_identical,
     recast,
     sanity_check,
-    to_transaction,
+    to_payload,
 )
 
 log = logging.getLogger(__name__)
@@ -81,7 +82,9 @@ def calculate_relative_conductances(original: dict) -> dict:
     return original
 
 
-def get_ion_channels_transaction(iuphar_data, iuphar_compiled, hugo, gene_ontology):
+def get_ion_channels_transaction(
+    iuphar_data, iuphar_ensg, iuphar_compiled, hugo, gene_ontology
+):
     log.info("Finding ion channels in TCDB...")
 
     selectivity: pd.DataFrame = iuphar_data["selectivity"]
@@ -130,16 +133,7 @@ def get_ion_channels_transaction(iuphar_data, iuphar_compiled, hugo, gene_ontolo
 
     # >>> Address point 3
     log.info("Returning to ensembl gene IDs...")
-    database_links = iuphar_data["database_link"]
-    # This drops everything not from ensembl
-    database_links = database_links.loc[database_links["database_id"] == "15"]
-    # We now select just human data
-    database_links = database_links.loc[database_links["species_id"] == "1"]
-    # Recast the frame...
-    database_links = recast(
-        database_links, {"placeholder": "ensg", "object_id": "object_id"}
-    ).dropna()
-    selectivity = selectivity.merge(database_links, how="inner", on="object_id")
+    selectivity = join_iuphar_ensg(selectivity, iuphar_ensg)
     # Inner merge, since we have no need for lines with no ENSGs.
     # Remove the cols that are now useless after the merge.
     selectivity = selectivity.drop(columns=["object_id", "selectivity_id"])
@@ -368,9 +362,7 @@ def get_ion_channels_transaction(iuphar_data, iuphar_compiled, hugo, gene_ontolo
     # under the "type" column.
     tf_table = recast(tf_table, {"Type": "type", "Target id": "object_id"})
 
-    # I re-use the "database links" frame to go from the IDs to ENSGs
-    database_links["object_id"] = database_links["object_id"].astype(int)
-    tf_table = tf_table.merge(database_links, how="left", on="object_id")
+    tf_table = join_iuphar_ensg(tf_table, iuphar_ensg, how="left")
 
     tf_table = tf_table[tf_table["type"].isin(("lgic", "vgic", "other_ic"))]
     tf_table = tf_table.drop(columns=["type", "object_id"])
@@ -454,4 +446,4 @@ def get_ion_channels_transaction(iuphar_data, iuphar_compiled, hugo, gene_ontolo
 
     ion_channels = ion_channels.drop_duplicates()
 
-    return to_transaction(ion_channels, "channels")
+    return to_payload(ion_channels, "channels")
@@ -1,6 +1,6 @@
 import logging
 
-from daedalus.utils import recast, to_transaction
+from daedalus.utils import recast, to_payload
 
 log = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ def get_iuphar_targets_transaction(iuphar_casted):
         },
     )
 
-    return to_transaction(data.drop_duplicates(), "iuphar_targets")
+    return to_payload(data.drop_duplicates(), "iuphar_targets")
 
 
 def get_iuphar_ligands_transaction(iuphar_casted):
@@ -43,7 +43,7 @@ def get_iuphar_ligands_transaction(iuphar_casted):
         },
     )
 
-    return to_transaction(relevant_data.drop_duplicates(), "iuphar_ligands")
+    return to_payload(relevant_data.drop_duplicates(), "iuphar_ligands")
 
 
 def get_iuphar_interaction_transaction(iuphar_casted):
@@ -67,4 +67,4 @@ def get_iuphar_interaction_transaction(iuphar_casted):
 
     relevant_data = relevant_data.drop(columns=["species"]).drop_duplicates()
 
-    return to_transaction(relevant_data, "iuphar_interaction")
+    return to_payload(relevant_data, "iuphar_interaction")
@@ -2,26 +2,32 @@ import logging
 
 import pandas as pd
 
-from daedalus.utils import recast, to_transaction
+from daedalus.derived import join_iuphar_ensg
+from daedalus.shards import read_columns
+from daedalus.utils import recast, to_payload, to_payloads
 
 log = logging.getLogger(__name__)
 
+ORIGIN_GENES_PER_CHUNK = 500
+"""Number of genes to merge at once in `get_origin_transaction`"""
+
 ## NOTE: I don't add docstrings for these functions as they are a bit redundant:
 # Imagine that the typical docstring is "Parses the input data to digested data
 # for the database".
 
 
 def get_aquaporins_transaction(hugo, patlas):
-    aquaporins = recast(hugo["porins"], {"Ensembl gene ID": "ensg"}).drop_duplicates()
-
+    mold = {"Ensembl gene ID": "ensg"}
+    aquaporins = recast(read_columns(hugo, "porins", mold), mold).drop_duplicates()
+
+    mold = {
+        "Gene": "ensg",
+        "Tissue": "expression_tissue",
+        "Level": "expression_level",
+        "Reliability": "rel",
+    }
     tissue_expression = recast(
-        patlas["normal_tissue_expression"],
-        {
-            "Gene": "ensg",
-            "Tissue": "expression_tissue",
-            "Level": "expression_level",
-            "Reliability": "rel",
-        },
+        read_columns(patlas, "normal_tissue_expression", mold), mold
     )
 
     # No need for 'Uncertain' stuff
@@ -42,31 +48,29 @@ def get_aquaporins_transaction(hugo, patlas):
 
     aquaporins = aquaporins.drop_duplicates()
 
-    return to_transaction(aquaporins, "aquaporins")
+    return to_payload(aquaporins, "aquaporins")
 
 
 def get_origin_transaction(patlas):
     # These are all simple recasts and selections to remove "uncertain" or
-    # "no expression" samples.
+    # "no expression" samples. Only the columns that are used are read.
+    mold = {
+        "Gene": "ensg",
+        "Tissue": "tissue",
+        "Cell type": "cell_type",
+        "Level": "expression_level",
+        "Reliability": "rel",
+    }
     tissue_expression = recast(
-        patlas["normal_tissue_expression"],
-        {
-            "Gene": "ensg",
-            "Tissue": "tissue",
-            "Cell type": "cell_type",
-            "Level": "expression_level",
-            "Reliability": "rel",
-        },
-    )
-    subcellular = recast(
-        patlas["subcellular_location"],
-        {
-            "Gene": "ensg",
-            "Main location": "subcellular_location",
-            "Reliability": "rel",
-            "Extracellular location": "extracellular_location",
-        },
+        read_columns(patlas, "normal_tissue_expression", mold), mold
     )
+    mold = {
+        "Gene": "ensg",
+        "Main location": "subcellular_location",
+        "Reliability": "rel",
+        "Extracellular location": "extracellular_location",
+    }
+    subcellular = recast(read_columns(patlas, "subcellular_location", mold), mold)
 
     # No need for 'Uncertain' stuff
     tissue_expression = tissue_expression[tissue_expression["rel"] != "Uncertain"]
@@ -97,15 +101,33 @@ def get_origin_transaction(patlas):
         lambda x: x.strip("1234567890").strip()
     )
 
-    # We produce the final dataframe
-    merged = tissue_expression.merge(subcellular, how="outer", on="ensg")
+    # We produce the final dataframe.
+    # The outer merge makes a row for every tissue and location of a gene, so
+    # it is huge. Genes never share rows, so we can merge (and emit) a chunk
+    # of genes at a time, keeping just one chunk in memory.
+    tissue_expression = tissue_expression.sort_values("ensg", kind="stable")
+    subcellular = subcellular.sort_values("ensg", kind="stable")
+    genes = pd.concat([tissue_expression["ensg"], subcellular["ensg"]])
+    genes = genes.dropna().drop_duplicates().sort_values().tolist()
+
+    for start in range(0, len(genes), ORIGIN_GENES_PER_CHUNK):
+        first, last = genes[start], genes[start : start + ORIGIN_GENES_PER_CHUNK][-1]
 
-    merged = merged.drop_duplicates()
+        def select(data: pd.DataFrame) -> pd.DataFrame:
+            left = data["ensg"].searchsorted(first, side="left")
+            right = data["ensg"].searchsorted(last, side="right")
+            return data.iloc[left:right]
 
-    return to_transaction(merged, "origin")
+        merged = select(tissue_expression).merge(
+            select(subcellular), how="outer", on="ensg"
+        )
 
+        merged = merged.drop_duplicates()
 
-def get_function_transaction(iuphar):
+        yield from to_payloads(merged, "origin")
+
+
+def get_function_transaction(iuphar, iuphar_ensg):
     function = recast(
         iuphar["physiological_function"],
         {"object_id": None, "description": "physiological_function"},
@@ -113,17 +135,7 @@ def get_function_transaction(iuphar):
     # The IUPHAR has this dataframe with the functional annotations
     # We have to unpack them and merge
     log.info("Returning to ensembl gene IDs...")
-    database_links = iuphar["database_link"]
-    # This drops everything not from ensembl
-    database_links = database_links.loc[database_links["database_id"] == "15"]
-    # We now select just human data
-    database_links = database_links.loc[database_links["species_id"] == "1"]
-    # Recast the frame...
-    database_links = recast(
-        database_links, {"placeholder": "ensg", "object_id": None}
-    ).dropna()
-
-    function: pd.DataFrame = function.merge(database_links, on="object_id")
+    function: pd.DataFrame = join_iuphar_ensg(function, iuphar_ensg)
     function.drop(columns=["object_id"], inplace=True)
 
     # Now we have more or less what we want.
@@ -132,10 +144,10 @@ def get_function_transaction(iuphar):
 
     function.drop_duplicates(inplace=True)
 
-    return to_transaction(function, "function")
+    return to_payload(function, "function")
 
 
-def get_structure_transaction(iuphar):
+def get_structure_transaction(iuphar, iuphar_ensg):
     structure = recast(
         iuphar["structural_info"],
         {
@@ -152,16 +164,11 @@ def get_structure_transaction(iuphar):
         iuphar["associated_protein"], {"object_id": None, "type": "role"}
     )
 
-    # This bit is copy-pasted. Get the iuphar object-id to ensg frame
+    # `join_iuphar_ensg` makes the object IDs integers, so these have to be too
+    protein_type["object_id"] = protein_type["object_id"].astype("int64")
+
     log.info("Returning to ensembl gene IDs...")
-    database_links = iuphar["database_link"]
-    database_links = database_links.loc[database_links["database_id"] == "15"]
-    database_links = database_links.loc[database_links["species_id"] == "1"]
-    database_links = recast(
-        database_links, {"placeholder": "ensg", "object_id": None}
-    ).dropna()
-
-    structure: pd.DataFrame = structure.merge(database_links, on="object_id")
+    structure: pd.DataFrame = join_iuphar_ensg(structure, iuphar_ensg)
     structure = structure.merge(protein_type, how="outer", on="object_id")
     structure.drop(columns=["object_id", "species_id"], inplace=True)
 
@@ -170,4 +177,4 @@ def get_structure_transaction(iuphar):
     )
     structure.drop_duplicates(inplace=True)
 
-    return to_transaction(structure, "structure")
+    return to_payload(structure, "structure")
@@ -1,6 +1,6 @@
 import logging
 
-from daedalus.utils import lmap, recast, split_ensembl_ids, to_transaction
+from daedalus.utils import recast, to_payloads
 
 log = logging.getLogger(__name__)
 
@@ -9,21 +9,17 @@ log = logging.getLogger(__name__)
 # for the database".
 
 
-def get_protein_structures_transaction(mart_data):
+def get_protein_structures_transaction(mart_ids):
     ids = recast(
-        mart_data["proteins"],
+        mart_ids["proteins"],
         {
-            "transcript_stable_id_version": "enst",
-            "protein_stable_id_version": "ensp",
+            "enst": "enst",
+            "ensp": "ensp",
             "pdb_id": "pdb_id",
             "refseq_peptide_id": "refseq_protein_id",
         },
     )
 
-    log.info("Purging ensembl versions...")
-    ids["enst"] = lmap(lambda x: split_ensembl_ids(x).full_id_no_version, ids["enst"])
-    ids["ensp"] = lmap(lambda x: split_ensembl_ids(x).full_id_no_version, ids["ensp"])
-
     ids = ids.drop_duplicates()
 
-    return to_transaction(ids, "protein_ids")
+    return to_payloads(ids, "protein_ids")
@@ -2,12 +2,13 @@ import logging
 
 import pandas as pd
 
+from daedalus.shards import read_columns
 from daedalus.utils import (
     apply_thesaurus,
     explode_on,
     get_local_csv,
     recast,
-    to_transaction,
+    to_payload,
 )
 
 log = logging.getLogger(__name__)
@@ -18,11 +19,12 @@ log = logging.getLogger(__name__)
 
 
 def get_atp_driven_carriers_transaction(hugo):
-    data = recast(hugo["atpases"], {"Ensembl gene ID": "ensg"}).drop_duplicates()
+    mold = {"Ensembl gene ID": "ensg"}
+    data = recast(read_columns(hugo, "atpases", mold), mold).drop_duplicates()
 
     log.info("Dropping AAA - Atpases since they are not transporters...")
     p = len(data["ensg"])
-    aaa_atpases = recast(hugo["AAA_atpases"], {"Ensembl gene ID": "ensg"})
+    aaa_atpases = recast(read_columns(hugo, "AAA_atpases", mold), mold)
     data = data.drop(data[data["ensg"].isin(aaa_atpases["ensg"])].index)
     log.info(f"Dropped {p - len(data['ensg'])} entries.")
 
@@ -63,7 +65,7 @@ def get_atp_driven_carriers_transaction(hugo):
 
     data = apply_thesaurus(data)
 
-    return to_transaction(data, "pumps")
+    return to_payload(data, "pumps")
 
 
 def get_abc_transporters_transaction(hugo):
@@ -108,4 +110,4 @@ def get_abc_transporters_transaction(hugo):
 
     data = apply_thesaurus(data)
 
-    return to_transaction(data, "ABC_transporters")
+    return to_payload(data, "ABC_transporters")
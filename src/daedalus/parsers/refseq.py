@@ -1,8 +1,6 @@
 import logging
 
-import pandas as pd
-
-from daedalus.utils import lmap, split_ensembl_ids, to_transaction
+from daedalus.utils import recast, to_payload
 
 log = logging.getLogger(__name__)
 
@@ -11,19 +9,12 @@ log = logging.getLogger(__name__)
 # for the database".
 
 
-def get_refseq_transaction(mart_data):
-    refseq = mart_data["proteins"][["transcript_stable_id_version", "refseq_mrna_id"]]
-
-    refseq = pd.DataFrame(
-        {
-            "refseq_transcript_id": refseq["refseq_mrna_id"],
-            "enst": lmap(
-                lambda x: split_ensembl_ids(x).full_id_no_version,
-                refseq["transcript_stable_id_version"],
-            ),
-        }
+def get_refseq_transaction(mart_ids):
+    refseq = recast(
+        mart_ids["proteins"],
+        {"refseq_mrna_id": "refseq_transcript_id", "enst": "enst"},
     )
 
     refseq = refseq.drop_duplicates()
 
-    return to_transaction(refseq, "mrna_refseq")
+    return to_payload(refseq, "mrna_refseq")
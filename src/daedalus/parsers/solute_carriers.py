@@ -5,15 +5,9 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
+from daedalus.derived import join_iuphar_ensg
 from daedalus.static_solute_hits import STATIC_HITS, Entry
-from daedalus.utils import (
-    apply_thesaurus,
-    flatten,
-    get_local_csv,
-    lmap,
-    recast,
-    to_transaction,
-)
+from daedalus.utils import apply_thesaurus, flatten, get_local_csv, recast, to_payload
 
 log = logging.getLogger(__name__)
 
@@ -307,7 +301,7 @@ def grac_to_entry(id: int, grac: str) -> Optional[Entry]:
     ]
 
 
-def get_solute_carriers_transaction(hugo, iuphar, slc):
+def get_solute_carriers_transaction(hugo, iuphar, iuphar_ensg, slc):
     log.info("Recasting solute carrier frames...")
     solute_carriers = recast(
         hugo["solute_carriers"],
@@ -326,15 +320,6 @@ def get_solute_carriers_transaction(hugo, iuphar, slc):
         .dropna(subset="stoichiometry_annotations")
     )
 
-    object_infos = recast(
-        iuphar["database_link"],
-        {
-            "object_id": "object_id",
-            "database_id": "db",  # n. 15 is ensg,
-            "placeholder": "ensg",
-        },
-    )
-
     slc = recast(
         slc,
         {
@@ -344,15 +329,8 @@ def get_solute_carriers_transaction(hugo, iuphar, slc):
         },
     )
 
-    object_infos: pd.DataFrame = object_infos.loc[object_infos["db"] == "15",]
-    object_infos = object_infos.drop(columns="db")
-    # Drop the non-human IDs
-    object_infos = object_infos.loc[
-        lmap(lambda x: x.startswith("ENSG"), object_infos["ensg"]),
-    ]
-
     # Merge with stochiometry info
-    stoich = stoich.merge(object_infos, how="left", on="object_id")
+    stoich = join_iuphar_ensg(stoich, iuphar_ensg, how="left")
 
     # The first here is the row_id
     # The first in the tuple is the object id
@@ -415,4 +393,4 @@ def get_solute_carriers_transaction(hugo, iuphar, slc):
 
     solute_carriers = apply_thesaurus(solute_carriers)
 
-    return to_transaction(solute_carriers, "solute_carriers")
+    return to_payload(solute_carriers, "solute_carriers")
@@ -2,14 +2,7 @@ import logging
 
 import pandas as pd
 
-from daedalus.utils import (
-    lmap,
-    recast,
-    split_ensembl_ids,
-    split_refseq_ids,
-    split_tcdb_ids,
-    to_transaction,
-)
+from daedalus.utils import lmap, recast, split_refseq_ids, split_tcdb_ids, to_payload
 
 log = logging.getLogger(__name__)
 
@@ -18,7 +11,7 @@ log = logging.getLogger(__name__)
 # for the database".
 
 
-def get_tcdb_ids_transaction(tcdb_data, mart_data):
+def get_tcdb_ids_transaction(tcdb_data, mart_ids):
     relevant_data = recast(
         tcdb_data["RefSeq_to_TC"], {"refseq_id": "refseq_protein_id", "tc_id": "tcid"}
     )
@@ -39,15 +32,10 @@ def get_tcdb_ids_transaction(tcdb_data, mart_data):
     )
 
     ensp_to_refseq = recast(
-        mart_data["proteins"],
-        {"protein_stable_id_version": "ensp", "refseq_peptide_id": "refseq_protein_id"},
+        mart_ids["proteins"],
+        {"ensp": "ensp", "refseq_peptide_id": "refseq_protein_id"},
     ).drop_duplicates()
 
-    # Drop the version
-    ensp_to_refseq["ensp"] = lmap(
-        lambda x: split_ensembl_ids(x).full_id_no_version, ensp_to_refseq["ensp"]
-    )
-
     # Add in the enst, mapping it to the refseq IDs
     ## TODO:: check if this merge is OK!!!
     tcdb_ids = tcdb_ids.merge(ensp_to_refseq, on="refseq_protein_id", how="inner")
@@ -57,7 +45,7 @@ def get_tcdb_ids_transaction(tcdb_data, mart_data):
 
     tcdb_ids = tcdb_ids.drop_duplicates()
 
-    return to_transaction(tcdb_ids, "tcdb_ids")
+    return to_payload(tcdb_ids, "tcdb_ids")
 
 
 def get_tcdb_definitions_transactions(tcdb_data):
@@ -82,7 +70,7 @@ def get_tcdb_definitions_transactions(tcdb_data):
         }
     )
 
-    transactions.append(to_transaction(tcdb_types, "tcdb_types"))
+    transactions.append(to_payload(tcdb_types, "tcdb_types"))
 
     # Identical reasoning as above. But this time, I have copy-pasted them.
     log.warn("Inputting hard-coded tcid_subtypes...")
@@ -142,7 +130,7 @@ def get_tcdb_definitions_transactions(tcdb_data):
         {"tcid_subtype": list(subtypes.keys()), "subtype_name": list(subtypes.values())}
     )
 
-    transactions.append(to_transaction(tcdb_subtypes, "tcdb_subtypes"))
+    transactions.append(to_payload(tcdb_subtypes, "tcdb_subtypes"))
 
     log.info("Parsing tc definitions...")
     tcdb_families = recast(
@@ -154,6 +142,6 @@ def get_tcdb_definitions_transactions(tcdb_data):
         lambda x: int("superfamily" in x.lower()), tcdb_families["family_name"]
     )
 
-    transactions.append(to_transaction(tcdb_families, "tcdb_families"))
+    transactions.append(to_payload(tcdb_families, "tcdb_families"))
 
     return transactions
@@ -1,8 +1,6 @@
 import logging
 
-import pandas as pd
-
-from daedalus.utils import lmap, sanity_check, split_ensembl_ids, to_transaction
+from daedalus.utils import lmap, sanity_check, to_payloads
 
 log = logging.getLogger(__name__)
 
@@ -11,51 +9,10 @@ log = logging.getLogger(__name__)
 # for the database".
 
 
-def get_transcripts_ids_transaction(mart_data):
+def get_transcripts_ids_transaction(mart_ids):
     log.info("Making transcripts_ids table transaction")
-    transcript_ids = mart_data["IDs"][
-        ["gene_stable_id_version", "transcript_stable_id_version"]
-    ]
-
-    log.info("Dropping duplicates...")
-    transcript_ids = transcript_ids.drop_duplicates(keep="first", ignore_index=True)
-
-    log.info("Parsing ensembl IDs...")
-    # this is ugly, but it applies "split_ensembl_ids" to the two cols
-    parsed_versions = transcript_ids[
-        ["gene_stable_id_version", "transcript_stable_id_version"]
-    ].applymap(split_ensembl_ids)
-
-    sanity_check(
-        (
-            transcript_ids["transcript_stable_id_version"]
-            == lmap(
-                lambda x: x.full_id, parsed_versions["transcript_stable_id_version"]
-            )
-        ).all(),
-        "ID order preserved",
-    )
-
-    log.info("Purging versions...")
-    transcript_ids = pd.DataFrame(
-        {
-            "ensg": lmap(
-                lambda x: x.full_id_no_version,
-                parsed_versions["gene_stable_id_version"],
-            ),
-            "enst": lmap(
-                lambda x: x.full_id_no_version,
-                parsed_versions["transcript_stable_id_version"],
-            ),
-            "enst_version": lmap(
-                lambda x: x.full_id, parsed_versions["transcript_stable_id_version"]
-            ),
-            "enst_version_leaf": lmap(
-                lambda x: x.version_number,
-                parsed_versions["transcript_stable_id_version"],
-            ),
-        }
-    )
+    # The IDs are already unique and parsed (see `daedalus.derived`)
+    transcript_ids = mart_ids["transcripts"]
 
     log.info("Setting canonical isoforms...")
     transcript_ids["is_canonical_isoform"] = 0
@@ -75,4 +32,4 @@ def get_transcripts_ids_transaction(mart_data):
         "Impossible to determine canonical isoforms for genes with multiple isoforms."
     )
 
-    return to_transaction(transcript_ids, "transcript_ids")
+    return to_payloads(transcript_ids, "transcript_ids")
@@ -1,19 +1,30 @@
+import csv
 import gzip
+import hashlib
+import json
 import multiprocessing
 import os
 import pickle
 import re
+import shutil
+import traceback
+import uuid
 import zipfile
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from copy import deepcopy
-from io import StringIO
+from datetime import datetime
+from functools import partial
+from io import BytesIO, StringIO
 from logging import getLogger
 from pathlib import Path
-from typing import TypeAlias
+from typing import Callable, Iterable, Optional, TypeAlias
 
 import pandas as pd
 from bs4 import BeautifulSoup
 from typing_extensions import Self
 
+from daedalus import __version__
 from daedalus.constants import (
     BIOMART,
     BIOMART_XML_REQUESTS,
@@ -26,8 +37,9 @@ from daedalus.constants import (
     SLC_TABLES,
     TCDB,
 )
-from daedalus.errors import Abort, CacheKeyError
-from daedalus.utils import lmap, pbar_get, pqdm, request_cosmic_download_url
+from daedalus.errors import Abort, CacheKeyError, CacheMutationError
+from daedalus.shards import LazyDataDict, read_shard, write_shard
+from daedalus.utils import lmap, pbar_get, pqdm, request_cosmic_download_url, thread_map
 
 log = getLogger(__name__)
 """The logger for this file."""
@@ -35,6 +47,22 @@ log = getLogger(__name__)
 CPUS = multiprocessing.cpu_count()
 """The CPU count of this machine."""
 
+HTTP_JOBS = 8
+"""Maximum number of requests in flight for retrievers that make many of them."""
+
+IUPHAR_TABLES = (
+    "selectivity",
+    "database_link",
+    "transporter",
+    "physiological_function",
+    "structural_info",
+    "associated_protein",
+)
+"""The tables of the IUPHAR database dump that are used by the parsers."""
+
+BIOMART_JOBS = 4
+"""Maximum number of BioMart queries in flight. BioMart is slow, and easily overloaded."""
+
 DataDict: TypeAlias = dict[pd.DataFrame]
 """DataDict-s have the same keys as the hardpoints, but with the pd.DataFrame-s as the values."""
 
@@ -121,18 +149,20 @@ def retrieve_cosmic_genes(auth_hash) -> DataDict:
     for key, value in COSMIC.items():
         log.info(f"Retrieving data for {key}")
         secure_url = request_cosmic_download_url(value, auth_hash)
-        data = pbar_get(secure_url)
+        # The signed urls are new every time, so there is no point in storing them
+        data = pbar_get(secure_url, store=False)
 
         log.info("Casting response...")
         if key == "IDs":
             # The IDS are given as a compressed TSV file
-            data = pd.read_csv(gzip.GzipFile(fileobj=data), sep="\t")
+            data = pd.read_csv(gzip.GzipFile(fileobj=data, mode="rb"), sep="\t")
         else:
             try:
                 data = pd.read_csv(data)
             except UnicodeDecodeError:
                 log.info("Failed to parse data. Trying to decompress...")
-                data = pd.read_csv(gzip.GzipFile(fileobj=data))
+                data.seek(0)
+                data = pd.read_csv(gzip.GzipFile(fileobj=data, mode="rb"))
 
         result[key] = data
 
@@ -152,8 +182,15 @@ class IUPHARGobbler:
     postgres engine. So, I just extract the data from the dump, and make it a
     pandas DataFrame.
 
-    This class "eats" up the dump line-by-line, finding the data and storing it
-    into Data Frames along the way. It discards other lines.
+    This class "eats" up the dump line-by-line, as raw bytes, finding the data
+    and storing it into Data Frames along the way. It discards other lines.
+    The lines of tables that are not wanted are skipped without even being
+    decoded. The lines of the wanted tables are gathered, and each table is
+    parsed in one go by the (C) CSV reader of pandas once it ends.
+
+    Args:
+        wanted (Optional[Iterable[str]], optional): The names of the tables to
+          keep, without the "public." prefix. Defaults to None (keep them all).
 
     Raises:
         RuntimeError: If the data being parsed does not make sense as a data dump.
@@ -162,9 +199,11 @@ class IUPHARGobbler:
     copy_line_re = re.compile("COPY (.*?) \\((.*?)\\) FROM stdin;")
     """RE to extract the header that begins a new table"""
 
-    def __init__(self) -> None:
+    def __init__(self, wanted: Optional[Iterable[str]] = None) -> None:
         self.tables = {}
+        self.wanted = None if wanted is None else set(wanted)
         self.opened_table = False
+        self.skipping_table = False
         self.current_table_name = None
         self.current_table_cols = []
         self.current_table_data = []
@@ -177,35 +216,47 @@ class IUPHARGobbler:
         self.current_table_data = []
         self.current_table_len = None
 
-    def gobble(self, line: str):
-        """Gobble a line from the PostGres dump.
+    def is_wanted(self, table_name: str) -> bool:
+        """Check if a table should be kept."""
+        if self.wanted is None:
+            return True
+        return table_name.removeprefix("public.") in self.wanted
+
+    def gobble(self, line: bytes):
+        """Gobble a raw line from the PostGres dump.
 
         Args:
-            line (str): The line to gobble
+            line (bytes): The line to gobble
 
         Raises:
             RuntimeError: If the line does not make sense in the context.
         """
-        line = line.rstrip("\n")
+        # Most lines belong to tables that we skip, so this comes first.
+        if self.skipping_table and not line.startswith(b"\\."):
+            return
 
         # If we see a COPY line, and we are not in a table, we need to open one.
-        if line.startswith("COPY") and self.opened_table is False:
+        if line.startswith(b"COPY") and self.opened_table is False:
             self.opened_table = True
 
-            match = self.copy_line_re.match(line)
+            match = self.copy_line_re.match(line.decode("utf-8"))
             self.current_table_name = match.groups()[0]
             self.current_table_cols = match.groups()[1].split(", ")
             self.current_table_len = len(self.current_table_cols)
+            self.skipping_table = not self.is_wanted(self.current_table_name)
 
             return
 
         # If we are in a table, but we see a "table has ended" mark (\.),
         # we close the table.
-        if self.opened_table and line.startswith("\\."):
+        if self.opened_table and line.startswith(b"\\."):
             self.opened_table = False
 
-            df = pd.DataFrame(self.current_table_data, columns=self.current_table_cols)
-            self.tables[self.current_table_name] = df
+            if not self.skipping_table:
+                self.tables[self.current_table_name] = self.parse_table(
+                    self.current_table_data, self.current_table_cols
+                )
+            self.skipping_table = False
 
             self.reset()
 
@@ -215,25 +266,55 @@ class IUPHARGobbler:
         # They are tab-separated (thank god, or we would have needed to parse
         # them better)
         if self.opened_table:
-            if not len(line.split("\t")) == self.current_table_len:
+            if line.count(b"\t") != self.current_table_len - 1:
                 raise RuntimeError(
                     f"Line {line} does not fit in the current schema for table {self.current_table_name}: {self.current_table_cols}"
                 )
 
-            raw_data = line.split("\t")
-            data = [x if x != "\\N" else None for x in raw_data]
-            self.current_table_data.append(data)
+            self.current_table_data.append(line.rstrip(b"\n") + b"\n")
 
             return
 
         # If we get here, we're ignoring the line - it is outside a table, and
         # it does not start one.
 
+    @staticmethod
+    def parse_table(lines: list[bytes], columns: list[str]) -> pd.DataFrame:
+        """Parse the data lines of a table to a DataFrame.
+
+        Every value is a string, and NULLs (\\N) are None.
+
+        Args:
+            lines (list[bytes]): The data lines, ending in a newline.
+            columns (list[str]): The names of the columns.
+
+        Returns:
+            pd.DataFrame: The parsed table.
+        """
+        if not lines:
+            return pd.DataFrame([], columns=columns)
+
+        frame = pd.read_csv(
+            BytesIO(b"".join(lines)),
+            sep="\t",
+            header=None,
+            names=columns,
+            dtype=str,
+            na_values=["\\N"],
+            keep_default_na=False,
+            skip_blank_lines=False,
+            quoting=csv.QUOTE_NONE,
+            encoding="utf-8",
+        )
+
+        return frame.astype(object).where(frame.notna(), None)
+
 
 def retrieve_iuphar() -> DataDict:
     """Retrieve the IUPHAR database and parse it.
 
-    Parses the whole database to a series of tables, one for each table.
+    Parses the database dump to a series of tables, one for each table in
+    `IUPHAR_TABLES`. The other tables are skipped.
 
     Returns:
         DataDict: The dictionary with the parsed data
@@ -244,9 +325,9 @@ def retrieve_iuphar() -> DataDict:
     zip = zipfile.ZipFile(bytes)
 
     log.info("Running preliminary parsing operations...")
-    gobbler = IUPHARGobbler()
-    for line in pqdm(zip.open(zip.namelist()[0]).readlines()):
-        line = line.decode("utf-8")
+    gobbler = IUPHARGobbler(wanted=IUPHAR_TABLES)
+    # Iterating on the stream reads the dump one line at a time
+    for line in pqdm(zip.open(zip.namelist()[0])):
         gobbler.gobble(line)
 
     log.info("Done retrieving IUPHAR data")
@@ -263,6 +344,90 @@ def retrieve_iuphar() -> DataDict:
     return tables
 
 
+def share(data):
+    """Make a copy-on-write view of some cached data, to be handed out.
+
+    Frames are copied shallowly: with pandas' copy-on-write mode (see
+    `daedalus.utils`), changing the copy copies the data first, so the original
+    frame is never changed. Dicts and lists are copied, and their items shared
+    in the same way. Immutable data is given as-is. Anything else is copied
+    deeply, to be safe.
+
+    Args:
+        data (Any): The data to share.
+
+    Returns:
+        Any: The view of the data.
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.copy(deep=False)
+    if isinstance(data, LazyDataDict):
+        return data.view()
+    if isinstance(data, dict):
+        return {key: share(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [share(x) for x in data]
+    if isinstance(data, (str, bytes, int, float, bool, type(None))):
+        return data
+
+    return deepcopy(data)
+
+
+def get_size(data) -> int:
+    """Estimate how many bytes of memory some cached data uses.
+
+    Args:
+        data (Any): The data to measure.
+
+    Returns:
+        int: The (approximate) size of the data, in bytes.
+    """
+    if isinstance(data, pd.DataFrame):
+        return int(data.memory_usage(deep=True).sum())
+    if isinstance(data, pd.Series):
+        return int(data.memory_usage(deep=True))
+    if isinstance(data, LazyDataDict):
+        # Only the frames that were read take up memory
+        return sum(get_size(x) for x in data.memo.values())
+    if isinstance(data, Mapping):
+        return sum(get_size(x) for x in data.values())
+
+    return len(pickle.dumps(data))
+
+
+def get_fingerprint(data) -> str:
+    """Compute a fingerprint of some cached data, to detect changes to it.
+
+    Args:
+        data (Any): The data to fingerprint.
+
+    Returns:
+        str: The fingerprint, as a hex digest.
+    """
+    digest = hashlib.sha256()
+
+    def feed(item):
+        if isinstance(item, Mapping):
+            for key, value in item.items():
+                digest.update(repr(key).encode("UTF-8"))
+                feed(value)
+            return
+        if isinstance(item, (pd.DataFrame, pd.Series)):
+            try:
+                hashes = pd.util.hash_pandas_object(item, index=True)
+                digest.update(hashes.to_numpy().tobytes())
+                if isinstance(item, pd.DataFrame):
+                    digest.update(repr(item.dtypes.to_dict()).encode("UTF-8"))
+                return
+            except TypeError:
+                # Unhashable values (e.g. lists in cells) are pickled instead
+                pass
+        digest.update(pickle.dumps(item))
+
+    feed(data)
+    return digest.hexdigest()
+
+
 class ResourceCache:
     """A cache that saves data for reuse later.
 
@@ -273,81 +438,438 @@ class ResourceCache:
     there are no safeguards, and it was made in 4 minutes. It is also probably
     redundant in this case. But I made it, it's here, it works, so I'm keeping it.
 
-    It can be used with `with` statements to access tha data safely (copying it):
+    The cache lives in a folder on disk, with one "shard" per hook key and a
+    manifest that lists the shards. Shards are only loaded the first time that
+    their key is requested, and each one can be regenerated on its own (see
+    `invalidate`). Frames are stored in a columnar format, so DataDicts are
+    loaded one frame at a time (see `daedalus.shards`).
+
+    Besides the hooks, the cache can hold "derived" keys: data computed from
+    the data of a hook key (e.g. normalised tables of IDs), so that the many
+    users of the derived data do not compute it over and over. Derived data is
+    computed the first time that it is needed, then saved and loaded like the
+    data of the hooks. Each shard has a stamp, and the shards of derived keys
+    remember the stamp of their base key, so derived data is computed again
+    whenever its base key is retrieved again.
+
+    It can be used with `with` statements to access tha data safely:
 
     ```
     with cache(key) as data:
         ... # Use the data
     ```
 
+    The data is not copied: every access gets a copy-on-write view of it (see
+    `share`), so changing it does not change what the next user gets. In
+    strict mode, the cache also remembers a fingerprint of the data of each
+    key, and `verify` can check that nobody changed it in place anyway.
+
+    Data is kept in memory once loaded, until it is dropped: either when all
+    of its declared consumers are done with it (see `add_consumers` and
+    `release`), or when the data in memory is larger than `max_memory`, in
+    which case the least recently used keys are dropped first. The budget is
+    checked whenever a key is used, and whenever a frame of a lazily loaded
+    DataDict is read. Dropped data is still on disk, and is loaded again if
+    it is needed.
+
     Raises:
         CacheKeyError: If the requested key is not in the data.
     """
 
-    __data = {}
-    __populated = False
-
-    def __init__(self, cache_path: Path, hooks) -> None:
+    MANIFEST_NAME = "manifest.json"
+    """Name of the manifest file in the cache folder"""
+
+    def __init__(
+        self,
+        cache_path: Path,
+        hooks,
+        download_jobs: int = 1,
+        strict: bool = False,
+        max_memory: Optional[int] = None,
+        derived: Optional[dict[str, tuple[str, Callable]]] = None,
+    ) -> None:
         self.target_key = None
         self.__hooks = hooks
+        self.__derived = derived or {}
+        """Derived keys, as {key: (base_key, function)}. See the class docs."""
         self.__cache_path = cache_path
+        self.__download_jobs = download_jobs
+        self.__data = {}
+        """The data loaded in memory, by key, least recently used first"""
+        self.__fingerprints = {}
+        """Fingerprints of the data handed out in strict mode, by key"""
+        self.__consumers = {}
+        """Number of consumers of each key that did not release it yet"""
+        self.strict = strict
+        self.max_memory = max_memory
+        """Bytes of data to keep in memory, at most. If None, there is no limit."""
 
     def __call__(self, key: str) -> Self:
         self.target_key = key
         return self
 
-    def populate(self):
+    def __read_manifest(self) -> dict:
+        manifest_path = self.__cache_path / self.MANIFEST_NAME
+        if not manifest_path.exists():
+            return {}
+
+        with manifest_path.open("r") as stream:
+            manifest = json.load(stream)
+
+        if not isinstance(manifest, dict):
+            log.critical(
+                "Loaded cache manifest is not a dictionary!! What have I done!?"
+            )
+            raise Abort
+
+        return manifest
+
+    def __write_manifest(self, manifest: dict) -> None:
+        # Write to a temporary file first, so that a crash never leaves a
+        # half-written manifest behind.
+        manifest_path = self.__cache_path / self.MANIFEST_NAME
+        temp_path = manifest_path.with_suffix(".tmp")
+        with temp_path.open("w+") as stream:
+            json.dump(manifest, stream, indent=4)
+        os.replace(temp_path, manifest_path)
+
+    @staticmethod
+    def __stamp(manifest: dict, key: str) -> Optional[str]:
+        """Get the stamp of the shard of a key, if it has one"""
+        if key not in manifest:
+            return None
+        # Shards saved before stamps were a thing can use their retrieval date
+        return manifest[key].get("stamp", manifest[key].get("retrieved"))
+
+    def is_stored(self, key: str) -> bool:
+        """Check if the (up-to-date) data for a key is already saved to disk"""
+        manifest = self.__read_manifest()
+        if (
+            key not in manifest
+            or not (self.__cache_path / manifest[key]["file"]).exists()
+        ):
+            return False
+
+        if key in self.__derived:
+            base, _ = self.__derived[key]
+            return manifest[key].get("base_stamp") == self.__stamp(manifest, base)
+        return True
+
+    def keys(self) -> list[str]:
+        """Get all the keys of the cache: the hook keys, then the derived ones"""
+        return list(self.__hooks) + list(self.__derived)
+
+    def add_consumers(self, consumers: dict[str, int]) -> None:
+        """Declare how many more times some keys will be used.
+
+        Once a key was released (see `release`) as many times as it has
+        consumers, its data is dropped from memory.
+
+        Args:
+            consumers (dict[str, int]): How many consumers each key has.
+        """
+        for key, count in consumers.items():
+            self.__consumers[key] = self.__consumers.get(key, 0) + count
+
+    def release(self, keys: Iterable[str]) -> None:
+        """Signal that a consumer of some keys is done with them.
+
+        Keys without declared consumers are ignored.
+
+        Args:
+            keys (Iterable[str]): The keys that the consumer used.
+        """
+        for key in keys:
+            if key not in self.__consumers:
+                continue
+            self.__consumers[key] -= 1
+            if self.__consumers[key] <= 0:
+                del self.__consumers[key]
+                log.debug(f"No consumers are left for '{key}'. Dropping it.")
+                self.drop(key)
+
+    def drop(self, key: str) -> None:
+        """Drop the data of a key from memory. It is kept on disk."""
+        self.__data.pop(key, None)
+        self.__fingerprints.pop(key, None)
+
+    def __enforce_memory_budget(self, keep: Optional[str] = None) -> None:
+        """Drop the least recently used keys until the data fits `max_memory`.
+
+        Args:
+            keep (Optional[str], optional): A key to never drop, as it is being
+              used. Defaults to None.
+        """
+        if self.max_memory is None:
+            return
+
+        sizes = {key: get_size(data) for key, data in self.__data.items()}
+        # The data is ordered from the least to the most recently used
+        for key in list(self.__data):
+            if sum(sizes.values()) <= self.max_memory:
+                break
+            if key == keep:
+                continue
+            log.info(f"Cached data is over the memory budget. Dropping '{key}'.")
+            self.drop(key)
+            del sizes[key]
+
+    def __store(self, key: str, data, base_stamp: Optional[str] = None) -> None:
+        """Save the data of a key to its shard, and add it to the manifest
+
+        Args:
+            key (str): The key to save the data of.
+            data (Any): The data to save.
+            base_stamp (Optional[str], optional): For derived keys, the stamp of
+              the shard of the base key. Defaults to None.
+        """
+        self.__data.pop(key, None)
+        self.__data[key] = data
+        self.__fingerprints.pop(key, None)
+        # Whatever was derived from the old data is stale
+        for derived, (base, _) in self.__derived.items():
+            if base == key:
+                self.drop(derived)
+        self.__enforce_memory_budget(keep=key)
+
+        log.info(f"Dumping data for '{key}' to the cache @ {self.__cache_path}")
+        os.makedirs(self.__cache_path, exist_ok=True)
+        entry = write_shard(self.__cache_path, key, data)
+
+        manifest = self.__read_manifest()
+        manifest[key] = entry | {
+            "retrieved": datetime.now().isoformat(timespec="seconds"),
+            "daedalus_version": __version__,
+            "stamp": uuid.uuid4().hex,
+        }
+        if base_stamp is not None:
+            manifest[key]["base_stamp"] = base_stamp
+        self.__write_manifest(manifest)
+
+    def __derive(self, key: str) -> None:
+        """Compute the data of a derived key from its base key, and save it"""
+        base, function = self.__derived[key]
+        log.info(f"Deriving data for '{key}' from '{base}'...")
+
+        data = function(share(self.__get(base)))
+        if base not in self.__consumers:
+            # Nobody else needs the base data (it can be loaded again if needed)
+            self.drop(base)
+
+        self.__store(key, data, base_stamp=self.__stamp(self.__read_manifest(), base))
+
+    def __load(self, key: str):
+        log.info(f"Loading cached data for '{key}'...")
+        data = read_shard(self.__cache_path, self.__read_manifest()[key])
+        if self.strict and isinstance(data, LazyDataDict):
+            # Every frame has to be in memory to be fingerprinted
+            data = dict(data)
+        elif isinstance(data, LazyDataDict):
+            # The frames take up memory only once they are read
+            data.on_memo = partial(self.__enforce_memory_budget, keep=key)
+        return data
+
+    def verify(self) -> None:
+        """Check that the data handed out in strict mode was not changed in place.
+
+        Does nothing if the cache is not in strict mode.
+
+        Raises:
+            CacheMutationError: If the data of some key was changed.
+        """
+        if not self.strict:
+            return
+
+        changed = [
+            key
+            for key, fingerprint in self.__fingerprints.items()
+            if key in self.__data and get_fingerprint(self.__data[key]) != fingerprint
+        ]
+        if changed:
+            raise CacheMutationError(f"Cached data was changed in place: {changed}")
+
+    def invalidate(self, keys: list[str]) -> None:
+        """Drop the cached data of some keys, so that they are retrieved again.
+
+        Args:
+            keys (list[str]): The keys to drop.
+
+        Raises:
+            Abort: If any of the keys is not one of the hooks of the cache.
+        """
+        unknown = [x for x in keys if x not in self.__hooks]
+        if unknown:
+            log.error(
+                f"Cannot regenerate unknown cache keys {unknown}. Valid keys: {list(self.__hooks)}"
+            )
+            raise Abort
+
+        # The data derived from the dropped keys has to go too
+        keys = list(keys) + [
+            derived
+            for derived, (base, _) in self.__derived.items()
+            if base in keys and derived not in keys
+        ]
+
+        manifest = self.__read_manifest()
+        for key in keys:
+            log.info(f"Dropping cached data for '{key}'...")
+            entry = manifest.pop(key, None)
+            self.__data.pop(key, None)
+            self.__fingerprints.pop(key, None)
+            if entry is None:
+                continue
+            shard_path = self.__cache_path / entry["file"]
+            if shard_path.is_dir():
+                shutil.rmtree(shard_path)
+            elif shard_path.exists():
+                os.remove(shard_path)
+
+        if manifest or (self.__cache_path / self.MANIFEST_NAME).exists():
+            self.__write_manifest(manifest)
+
+    def populate(self, keys: Optional[Iterable[str]] = None):
+        """Retrieve the data of the hooks that are not already on disk.
+
+        Derived keys are computed (see the class docs) once their base keys
+        are retrieved.
+
+        Args:
+            keys (Optional[Iterable[str]], optional): Retrieve only these keys.
+              Keys that are not hooks (or derived keys) of this cache are
+              ignored, with a warning. Defaults to None (all the hooks).
+        """
         log.info("Populating resource cache...")
-        if self.__cache_path.exists():
-            # We can load the pickled data
-            with self.__cache_path.open("rb") as stream:
-                data = pickle.load(stream)
-
-            if not isinstance(data, dict):
-                log.critical("Loaded pickle is not a dictionary!! What have I done!?")
-                raise Abort
-
-            # Check that the hooks are valid
-            if not all(
-                [loaded_key in data.keys() for loaded_key in self.__hooks.keys()]
-            ):
+        if keys is None:
+            keys = self.__hooks.keys()
+
+        unknown = [x for x in keys if x not in self.__hooks and x not in self.__derived]
+        if unknown:
+            log.warning(f"Cannot populate keys that are not cache hooks: {unknown}")
+
+        derived = [x for x in keys if x in self.__derived and not self.is_stored(x)]
+        # Derived keys need their base keys
+        hooks = list(dict.fromkeys([*keys, *(self.__derived[x][0] for x in derived)]))
+
+        missing = {
+            key: self.__hooks[key]
+            for key in hooks
+            if key in self.__hooks and not self.is_stored(key)
+        }
+
+        if missing:
+            self.__retrieve(missing)
+
+        for key in derived:
+            self.__derive(key)
+
+        if not missing and not derived:
+            log.debug("All cache keys are already saved to disk.")
+
+    def __retrieve(self, missing: dict) -> None:
+        """Run the retrievers of some hooks, saving their data.
+
+        Args:
+            missing (dict): The hooks to run, as {key: retriever}.
+        """
+        log.info(
+            f"Need to retrieve {len(missing)} of {len(self.__hooks)} hooks: {list(missing)}"
+        )
+        if self.__download_jobs > 1:
+            self.__retrieve_concurrently(missing)
+        else:
+            tot = len(missing)
+            for i, (key, retriever) in enumerate(missing.items()):
+                log.info(f"[ {i + 1} / {tot} ] Retrieving hook: {key}...")
+                self.__store(key, retriever())
+
+    def __retrieve_concurrently(self, hooks: dict) -> None:
+        """Run the retrievers in a bounded pool of worker threads.
+
+        The retrievers spend most of their time waiting on (different) servers,
+        so threads are enough to overlap them. Each result is saved to disk as
+        soon as it arrives.
+
+        If a hook fails, the hooks that did not start yet are cancelled, the
+        ones already running are allowed to finish, and Abort is raised after
+        the tracebacks of all the failures are logged.
+
+        Args:
+            hooks (dict): The hooks to run, as {key: retriever}.
+
+        Raises:
+            Abort: If any of the hooks failed.
+        """
+        tot = len(hooks)
+        workers = min(self.__download_jobs, tot)
+        log.info(f"Retrieving {tot} hooks with {workers} concurrent jobs...")
+
+        def retrieve(key, retriever):
+            log.info(f"Retrieving hook: {key}...")
+            return retriever()
+
+        failed = []
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="retriever"
+        ) as pool:
+            futures = {
+                pool.submit(retrieve, key, retriever): key
+                for key, retriever in hooks.items()
+            }
+            for i, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                if future.cancelled():
+                    log.warning(f"[ {i} / {tot} ] Cancelled hook: {key}")
+                    continue
+                try:
+                    data = future.result()
+                except Exception as e:
+                    log.error(
+                        f"[ {i} / {tot} ] Hook '{key}' failed with error >> {type(e)} <<. Cancelling pending hooks."
+                    )
+                    failed.append((key, e, "".join(traceback.format_exception(e))))
+                    for pending in futures:
+                        pending.cancel()
+                    continue
+                log.info(f"[ {i} / {tot} ] Retrieved hook: {key}")
+                self.__store(key, data)
+
+        if failed:
+            for key, e, msg in failed:
                 log.error(
                     (
-                        "Pickled data does not conform to the needed data signature. "
-                        "Cannot continue. "
-                        "Use `--regen-cache` to force a redownload."
+                        f"Hook {key} failed with error >> {type(e)} <<. Dumped traceback:\n"
+                        "-----------------------------\n"
+                        f"{msg}"
                     )
                 )
-                raise Abort
+            raise Abort
 
-            self.__data = data
-            self.__populated = True
-            log.debug("Loaded from pickled data.")
-            return
+    def __get(self, key: str):
+        """Get the (original) data of a key, loading or retrieving it if needed"""
+        if key not in self.__data:
+            if not self.is_stored(key):
+                self.populate([key])
+
+            # The key might have just been retrieved by `populate`
+            if key not in self.__data:
+                self.__data[key] = self.__load(key)
 
-        # If we get here, we need to download the data
-        tot = len(self.__hooks)
-        for i, (key, retriever) in enumerate(self.__hooks.items()):
-            log.info(f"[ {i + 1} / {tot} ] Retrieving hook: {key}...")
-            self.__data[key] = retriever()
+        # Move the key to the end, as the most recently used
+        data = self.__data.pop(key)
+        self.__data[key] = data
+        self.__enforce_memory_budget(keep=key)
 
-        self.__populated = True
+        if self.strict and key not in self.__fingerprints:
+            self.__fingerprints[key] = get_fingerprint(data)
 
-        log.info(f"Dumping downloaded data to pickle @ {self.__cache_path}")
-        if not self.__cache_path.parent.exists:
-            log.debug("Making datacache parent dirs...")
-            os.makedirs(self.__cache_path.parent, exist_ok=True)
-        with self.__cache_path.open("w+b") as stream:
-            pickle.dump(self.__data, stream)
+        return data
 
     def __enter__(self):
-        if self.target_key not in self.__hooks.keys():
+        if self.target_key not in self.keys():
             raise CacheKeyError(f"Invalid key: {self.target_key}")
 
-        if self.__populated is False:
-            self.populate()
-
-        return deepcopy(self.__data[self.target_key])
+        return share(self.__get(self.target_key))
 
     def __exit__(self, exc_type, exc, tb):
         pass
@@ -365,9 +887,7 @@ def retrieve_iuphar_compiled() -> DataDict:
         bytes = pbar_get(item)
 
         log.info(f"Casting {key}...")
-        answer[key] = pd.read_csv(
-            StringIO(bytes.read().decode("UTF-8")), skiprows=1, low_memory=False
-        )
+        answer[key] = pd.read_csv(bytes, encoding="UTF-8", skiprows=1, low_memory=False)
 
     log.info("Done retrieving IUPHAR casted data.")
     return answer
@@ -382,9 +902,15 @@ def retrieve_hugo() -> DataDict:
 
     log.info("Retrieving HUGO groups...")
     group_endpoint = HUGO["groups"]["endpoint"]
-    for group, group_id in HUGO["groups"]["IDs"].items():
+
+    def retrieve_group(group_id) -> pd.DataFrame:
         bytes = pbar_get(group_endpoint.format(id=group_id))
-        answer[group] = pd.read_csv(gzip.GzipFile(fileobj=bytes), sep="\t")
+        return pd.read_csv(gzip.GzipFile(fileobj=bytes, mode="rb"), sep="\t")
+
+    # The groups are small, so the time is all in the round trips
+    groups = HUGO["groups"]["IDs"]
+    frames = thread_map(retrieve_group, groups.values(), max_workers=HTTP_JOBS)
+    answer.update(zip(groups.keys(), frames))
 
     log.info("Done retrieving data for HGNC.")
 
@@ -394,7 +920,9 @@ def retrieve_hugo() -> DataDict:
 def retrieve_slc() -> pd.DataFrame:
     log.info("Retrieving solute carrier data...")
     bytes = pbar_get(SLC_TABLES)
-    soup = BeautifulSoup(gzip.GzipFile(fileobj=bytes).read().decode("UTF-8"), "lxml")
+    soup = BeautifulSoup(
+        gzip.GzipFile(fileobj=bytes, mode="rb").read().decode("UTF-8"), "lxml"
+    )
 
     tables = soup.find_all("table")
     frames = [pd.read_html(StringIO(x.prettify()), header=0)[0] for x in tables]
@@ -411,14 +939,22 @@ def retrieve_go() -> DataDict:
 
     # I need to dowload every term on its own because the backpropagation in GO
     # sucks balls, so terms in children do not appear in parent nodes.
+    # Asking for many parent terms in one query does not help: BioMart gives
+    # back the terms that each gene is annotated with, not the parent terms
+    # that matched, so the result cannot be split again.
+    # So, each unique term gets one query, and the queries run concurrently.
 
-    result = {}
-    for key, id in GO["terms"].items():
-        log.info(f"Downloading term '{id}' for key '{key}'")
-
+    def retrieve_term(id: str) -> list[str]:
+        log.info(f"Downloading term '{id}'")
         response = pbar_get(url=BIOMART, params={"query": xml_query.format(go_ids=id)})
         data = pd.read_table(response, header=0, sep="\t", low_memory=False)
-        result[key] = list(set(data["Gene stable ID"].to_list()))
+        return list(set(data["Gene stable ID"].to_list()))
+
+    terms = GO["terms"]
+    ids = list(dict.fromkeys(terms.values()))
+    genes = dict(zip(ids, thread_map(retrieve_term, ids, max_workers=BIOMART_JOBS)))
+
+    result = {key: list(genes[id]) for key, id in terms.items()}
 
     return result
 
@@ -430,9 +966,9 @@ def retrieve_protein_atlas() -> DataDict:
         log.info(f"Retrieving {key}...")
 
         response = pbar_get(url=url)
-        file = zipfile.ZipFile(response).filelist[0]
-        content = zipfile.ZipFile(response).read(file).decode("UTF-8")
-        data = pd.read_csv(StringIO(content), sep="\t")
+        with zipfile.ZipFile(response) as archive:
+            with archive.open(archive.filelist[0]) as file:
+                data = pd.read_csv(file, sep="\t", encoding="UTF-8")
 
         result[key] = data
 
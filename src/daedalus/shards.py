@@ -0,0 +1,297 @@
+"""Reading and writing of the files ("shards") of the ResourceCache on disk.
+
+Data frames (and DataDicts made only of frames) are saved in a columnar format,
+as one Parquet file per frame, so that they can be memory-mapped back in one
+frame (or even just a few columns, see `read_columns`) at a time. Everything
+else is pickled.
+"""
+
+import os
+import pickle
+import shutil
+from collections.abc import Mapping
+from logging import getLogger
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+log = getLogger(__name__)
+
+SINGLE_FRAME = "__frame__"
+"""Name given to the frame of shards that hold just one frame (and not a DataDict)"""
+
+
+def _null_kind(column: pd.Series) -> Optional[str]:
+    """Find out how the missing values of an object column are represented.
+
+    Parquet has just one type of NULL, but our frames use both None (e.g. the
+    IUPHAR dump) and NaN (most things read by pandas), and some parsers do care
+    about which one is which (`if x:` is True for NaN, but False for None).
+
+    Args:
+        column (pd.Series): The object column to inspect.
+
+    Returns:
+        Optional[str]: "none" if the missing values are all None, "nan" if they
+        are all NaN, None if there are no missing values, or "mixed" otherwise.
+    """
+    nulls = column[column.isna()]
+    if nulls.empty:
+        return None
+
+    if all(x is None for x in nulls):
+        return "none"
+    if all(isinstance(x, float) for x in nulls):
+        return "nan"
+    return "mixed"
+
+
+def write_frame(frame: pd.DataFrame, path: Path) -> dict:
+    """Write a frame to a Parquet file, returning its typed schema.
+
+    Args:
+        frame (pd.DataFrame): The frame to write.
+        path (Path): The path to write to.
+
+    Raises:
+        ValueError: If the missing values of an object column cannot be
+          faithfully written (see `_null_kind`).
+        pa.ArrowException: If the frame cannot be converted to an Arrow table,
+          e.g. because of mixed types in the same column.
+
+    Returns:
+        dict: The schema of the frame, with the column types and the
+        representation of the missing values of object columns.
+    """
+    schema = {"columns": {}, "nulls": {}}
+    for col in frame.columns:
+        schema["columns"][str(col)] = str(frame[col].dtype)
+        if frame[col].dtype != object:
+            continue
+
+        kind = _null_kind(frame[col])
+        if kind == "mixed":
+            raise ValueError(f"Column '{col}' has mixed types of missing values.")
+        if kind:
+            schema["nulls"][str(col)] = kind
+
+    table = pa.Table.from_pandas(frame)
+    pq.write_table(table, path)
+
+    return schema
+
+
+def read_frame(
+    path: Path, schema: dict, columns: Optional[list[str]] = None
+) -> pd.DataFrame:
+    """Read a frame written by `write_frame`, memory-mapping the file.
+
+    The columns are cast back to the types in the schema, if Arrow gives them
+    back as something else.
+
+    Args:
+        path (Path): The path to the Parquet file.
+        schema (dict): The schema returned by `write_frame`.
+        columns (Optional[list[str]], optional): Read only these columns.
+          Defaults to None (read all columns).
+
+    Returns:
+        pd.DataFrame: The frame.
+    """
+    table = pq.read_table(
+        path, columns=columns, memory_map=True, use_pandas_metadata=True
+    )
+    frame = table.to_pandas()
+
+    for col in frame.columns:
+        dtype = schema["columns"].get(str(col))
+        if dtype is not None and str(frame[col].dtype) != dtype:
+            frame[col] = frame[col].astype(dtype)
+
+    # Arrow gives back None for every missing value in object columns
+    for col, kind in schema["nulls"].items():
+        if kind == "nan" and col in frame.columns:
+            frame[col] = frame[col].where(frame[col].notna(), np.nan)
+
+    return frame
+
+
+class LazyDataDict(Mapping):
+    """A read-only DataDict that loads each frame from disk when first accessed.
+
+    It is what the ResourceCache gives back for DataDicts saved in the columnar
+    format. Frames are memoized once read. To read just some columns of a frame,
+    bypassing the memo, use `read` (or `read_columns`).
+
+    Views of a LazyDataDict (see `view`) share the frames read from disk, but
+    each view hands out its own (copy-on-write) shallow copies of them, so
+    changing the frames of a view does not change the frames of the others.
+    """
+
+    def __init__(
+        self,
+        folder: Path,
+        frames: dict,
+        memo: Optional[dict] = None,
+        on_memo: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.folder = folder
+        self.frames = frames
+        self.memo = {} if memo is None else memo
+        """The frames read from disk, shared by all views"""
+        self.loaded = {}
+        """The frames handed out by this view"""
+        self.on_memo = on_memo
+        """Called after a frame is memoized, e.g. to check a memory budget"""
+
+    def read(self, name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """Read a frame (or just some of its columns) straight from disk.
+
+        Args:
+            name (str): The name of the frame to read.
+            columns (Optional[list[str]], optional): The columns to read.
+              Defaults to None (all of them).
+
+        Returns:
+            pd.DataFrame: The frame.
+        """
+        entry = self.frames[name]
+        if entry["format"] == "pickle":
+            with (self.folder / entry["file"]).open("rb") as stream:
+                frame = pickle.load(stream)
+            return frame[columns] if columns else frame
+
+        return read_frame(self.folder / entry["file"], entry["schema"], columns)
+
+    def view(self) -> "LazyDataDict":
+        """Make a new view of this DataDict, sharing the frames read from disk."""
+        return LazyDataDict(self.folder, self.frames, self.memo, self.on_memo)
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in self.loaded:
+            if name not in self.memo:
+                self.memo[name] = self.read(name)
+                if self.on_memo is not None:
+                    self.on_memo()
+            self.loaded[name] = self.memo[name].copy(deep=False)
+        return self.loaded[name]
+
+    def __iter__(self):
+        return iter(self.frames)
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def __deepcopy__(self, memo):
+        # Frames that were not loaded yet are fresh anyway once they are read
+        new = self.view()
+        new.loaded = {key: value.copy(deep=True) for key, value in self.loaded.items()}
+        return new
+
+
+def read_columns(data: Mapping, name: str, columns: Iterable[str]) -> pd.DataFrame:
+    """Get just some columns of a frame of a DataDict.
+
+    If the frame of a `LazyDataDict` was not read yet, just these columns are
+    read from disk, and the frame is not memoized.
+
+    Args:
+        data (Mapping): The DataDict with the frame.
+        name (str): The name of the frame.
+        columns (Iterable[str]): The columns to get.
+
+    Returns:
+        pd.DataFrame: The frame, with just these columns.
+    """
+    columns = list(columns)
+    if isinstance(data, LazyDataDict) and name not in data.memo:
+        return data.read(name, columns)
+    return data[name][columns]
+
+
+def is_columnar(data) -> bool:
+    """Check if some data can be saved in the columnar format"""
+    if isinstance(data, pd.DataFrame):
+        return True
+    return (
+        isinstance(data, dict)
+        and len(data) > 0
+        and all(isinstance(x, pd.DataFrame) for x in data.values())
+    )
+
+
+def write_shard(folder: Path, key: str, data) -> dict:
+    """Write the data of a cache key to disk.
+
+    Frames and DataDicts are written in the columnar format, to a folder with
+    one Parquet file per frame. Frames that cannot be written as Parquet files
+    (see `write_frame`) are pickled in the same folder. Anything else is pickled
+    to a single file.
+
+    Args:
+        folder (Path): The folder of the cache.
+        key (str): The cache key that the data belongs to.
+        data (Any): The data to write.
+
+    Returns:
+        dict: The manifest entry of the shard, to be passed to `read_shard`.
+    """
+    if not is_columnar(data):
+        temp_path = folder / f"{key}.pickle.tmp"
+        with temp_path.open("w+b") as stream:
+            pickle.dump(data, stream)
+        os.replace(temp_path, folder / f"{key}.pickle")
+        return {"format": "pickle", "file": f"{key}.pickle"}
+
+    kind = "frame" if isinstance(data, pd.DataFrame) else "datadict"
+    frames = {SINGLE_FRAME: data} if kind == "frame" else data
+
+    temp_folder = folder / f"{key}.tmp"
+    shutil.rmtree(temp_folder, ignore_errors=True)
+    os.makedirs(temp_folder)
+
+    entries = {}
+    # Frame names can be anything, so they are not used as file names
+    for i, (name, frame) in enumerate(frames.items()):
+        try:
+            schema = write_frame(frame, temp_folder / f"{i}.parquet")
+            entries[name] = {"format": "parquet", "file": f"{i}.parquet"}
+            entries[name]["schema"] = schema
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            log.warning(f"Cannot save frame '{key}:{name}' as Parquet ({e}). Pickling.")
+            with (temp_folder / f"{i}.pickle").open("w+b") as stream:
+                pickle.dump(frame, stream)
+            entries[name] = {"format": "pickle", "file": f"{i}.pickle"}
+
+    shutil.rmtree(folder / key, ignore_errors=True)
+    os.replace(temp_folder, folder / key)
+
+    return {"format": "parquet", "kind": kind, "file": key, "frames": entries}
+
+
+def read_shard(folder: Path, entry: dict):
+    """Read the data of a cache key written by `write_shard`.
+
+    DataDicts are returned as `LazyDataDict`s, so their frames are only read
+    when they are used.
+
+    Args:
+        folder (Path): The folder of the cache.
+        entry (dict): The manifest entry of the shard.
+
+    Returns:
+        Any: The data of the shard.
+    """
+    # Shards written before the columnar format have no "format" key
+    if entry.get("format", "pickle") == "pickle":
+        with (folder / entry["file"]).open("rb") as stream:
+            return pickle.load(stream)
+
+    frames = LazyDataDict(folder / entry["file"], entry["frames"])
+    if entry["kind"] == "frame":
+        return frames[SINGLE_FRAME]
+    return frames
@@ -1,19 +1,29 @@
 import base64
 import functools
+import hashlib
 import json
 import math
+import os
 import re
 import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from importlib import resources
 from io import BytesIO, StringIO
 from logging import getLogger
 from numbers import Number
-from typing import Any, Optional
+from pathlib import Path
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
 
 import numpy as np
 import pandas as pd
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 from tqdm.auto import tqdm
 
 from daedalus import local_data, post_build_hooks
@@ -33,7 +43,169 @@ def get_mock_data():
     return "banana"
 
 
-def pbar_get(url: str, params: dict = {}, disable: bool = False) -> BytesIO:
+SPOOL_SIZE = 32 * 1024 * 1024
+"""Size (in bytes) after which downloads are moved from memory to a temporary file"""
+
+DOWNLOAD_STORE: Optional[Path] = None
+"""Folder to save downloads (and their HTTP validators) to, so they can be reused.
+
+Only responses with an ETag or a Last-Modified header are saved. If None,
+nothing is saved, and every download is done in full. Set it with
+`set_download_store`.
+"""
+
+DOWNLOAD_RETRIES = 5
+"""How many times to retry a failed download before giving up"""
+
+DOWNLOAD_BACKOFF = 2
+"""Seconds to wait before retrying a failed download. Doubles at every retry."""
+
+RETRY_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+"""HTTP status codes of (probably) transient errors, worth retrying"""
+
+HTTP_POOL_SIZE = 16
+"""How many connections to keep alive for each host in the shared session"""
+
+HTTP_TIMEOUT = (30, 300)
+"""Connect and read timeouts (in seconds) of HTTP requests"""
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def make_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """Make a new HTTP session, pooling connections to each host.
+
+    Args:
+        pool_size (int, optional): How many connections to keep alive for each
+          host. Should be at least as large as the number of threads that use
+          the session at once. Defaults to `HTTP_POOL_SIZE`.
+
+    Returns:
+        requests.Session: The new session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the HTTP session shared by all downloads, making it if needed.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """Replace the HTTP session shared by all downloads.
+
+    Use it to change the size of the connection pool, or to inject a fake
+    session in tests.
+
+    Args:
+        session (Optional[requests.Session]): The new session. If None, a
+          default one is made the next time that it is needed.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None and _session is not session:
+            _session.close()
+        _session = session
+
+
+def set_download_store(path: Optional[Path]) -> None:
+    """Set the folder where `pbar_get` saves downloads to reuse them later.
+
+    Args:
+        path (Optional[Path]): The folder to use. Made if missing. If None,
+          downloads are not saved.
+    """
+    global DOWNLOAD_STORE
+    if path is not None:
+        os.makedirs(path, exist_ok=True)
+    DOWNLOAD_STORE = path
+
+
+def get_stored_download_paths(url: str, params: dict) -> tuple[Path, Path]:
+    """Get the paths to the saved body and validators of a request.
+
+    Args:
+        url (str): The url of the request.
+        params (dict): The params of the request.
+
+    Returns:
+        tuple[Path, Path]: The path to the body and to the validators files.
+    """
+    # BioMart requests all have the same url, so the params are needed too
+    request = json.dumps([url, params], sort_keys=True).encode("UTF-8")
+    digest = hashlib.sha1(request).hexdigest()
+    return DOWNLOAD_STORE / f"{digest}.body", DOWNLOAD_STORE / f"{digest}.json"
+
+
+def remove_stored_download(url: str, params: dict) -> None:
+    """Remove the saved body and validators of a request, if any.
+
+    Args:
+        url (str): The url of the request.
+        params (dict): The params of the request.
+    """
+    for path in get_stored_download_paths(url, params):
+        path.unlink(missing_ok=True)
+
+
+def read_stored_validators(url: str, params: dict) -> dict:
+    """Read the validators of a previous download of a request, if any.
+
+    Args:
+        url (str): The url of the request.
+        params (dict): The params of the request.
+
+    Returns:
+        dict: The validators, with the "etag", "last_modified" and
+          "content_length" keys. Empty if there is no usable stored download.
+    """
+    if DOWNLOAD_STORE is None:
+        return {}
+
+    body, validators = get_stored_download_paths(url, params)
+    if not (body.exists() and validators.exists()):
+        return {}
+
+    with validators.open("r") as stream:
+        data = json.load(stream)
+
+    # A body of the wrong size (or contents) is not worth keeping
+    corrupted = data["content_length"] and body.stat().st_size != data["content_length"]
+    if not corrupted and data.get("sha256"):
+        with body.open("rb") as stream:
+            corrupted = (
+                hashlib.file_digest(stream, "sha256").hexdigest() != data["sha256"]
+            )
+    if corrupted:
+        log.warning(f"Stored download of {url} is corrupted. Removing it.")
+        remove_stored_download(url, params)
+        return {}
+
+    return data
+
+
+def pbar_get(
+    url: str,
+    params: dict = {},
+    disable: bool = False,
+    retries: int = DOWNLOAD_RETRIES,
+    backoff: float = DOWNLOAD_BACKOFF,
+    timeout: tuple[float, float] = HTTP_TIMEOUT,
+    store: bool = True,
+) -> IO[bytes]:
     """A requests.get() call with an added download bar
 
     The bar is suppressed if the log has an effective level of more than 20
@@ -44,44 +216,234 @@ def pbar_get(url: str, params: dict = {}, disable: bool = False) -> BytesIO:
 
     Tries to estimate download sizes from the response headers.
 
+    Requests are made with the shared session (see `get_session`), so
+    connections to the same host are kept alive and reused.
+
+    The response is streamed to a spooled temporary file: small downloads stay
+    in memory, but anything bigger than `SPOOL_SIZE` is moved to disk, so that
+    memory use does not grow with the size of the upstream files.
+
+    If the connection drops (or the server answers with a transient error),
+    the download is retried, waiting `backoff` seconds at first and twice as
+    long at every new try. The bytes that were already downloaded are kept,
+    and only the rest is requested again with a `Range` request. Once done,
+    the length of the download (and its MD5, if the server sent a Content-MD5)
+    is checked, and the download is resumed or restarted if it is wrong.
+
+    If a `DOWNLOAD_STORE` is set, responses with validators (ETag and/or
+    Last-Modified) are saved there instead. The next request to the same url
+    is made conditional, and the saved body is reused if the server answers
+    304 (Not Modified). If the server sends a new body instead, the saved one
+    is removed. Requests to one-time urls (e.g. signed ones) should not be
+    stored, as they are never made again: pass `store=False` for them.
+
     Args:
         url (str): The url to download from
         params (dict, optional): The params to pass to the GET request. Defaults to {}.
         disable (bool, optional): Disable the progress bar?. Defaults to False.
+        retries (int, optional): How many times to retry a failed download.
+          Defaults to `DOWNLOAD_RETRIES`.
+        backoff (float, optional): Seconds to wait before the first retry.
+          Defaults to `DOWNLOAD_BACKOFF`.
+        timeout (tuple[float, float], optional): The connect and read timeouts
+          of each request. Defaults to `HTTP_TIMEOUT`.
+        store (bool, optional): Save the download to the `DOWNLOAD_STORE`, if
+          one is set, and reuse a saved one? Defaults to True.
 
     Raises:
-        Abort: If the request failed.
+        Abort: If the request failed, even after retrying.
 
     Returns:
-        BytesIO: The downloaded data, as bytes wrapped in a BytesIO object.
+        IO[bytes]: The downloaded data, as a binary file object at position 0.
+          Temporary files are deleted when closed (or garbage collected).
     """
-    resp = requests.get(url=url, params=params, stream=True)
+    validators = read_stored_validators(url, params) if store else {}
 
     # Show only if we can show INFOs
     disable = disable or log.getEffectiveLevel() > 20
 
-    if resp.status_code > 299 or resp.status_code < 200:
-        log.error(
-            f"Request got response {resp.status_code} -- {resp.reason}. Aborting."
-        )
-        raise Abort
+    file = None
+    storable = False
+    written = 0
+    # The partial download in the `DOWNLOAD_STORE`, if any. It is removed on
+    # any exit but a successful one.
+    part = None
+    try:
+        for attempt in range(retries + 1):
+            if attempt:
+                wait = backoff * 2 ** (attempt - 1)
+                log.warning(
+                    f"Download from {url} failed. Retrying in {wait} seconds "
+                    f"({attempt}/{retries})..."
+                )
+                time.sleep(wait)
+
+            headers = {}
+            if written:
+                headers["Range"] = f"bytes={written}-"
+                # Get the whole thing again if it changed in the meantime
+                if new_validators["etag"] or new_validators["last_modified"]:
+                    headers["If-Range"] = (
+                        new_validators["etag"] or new_validators["last_modified"]
+                    )
+            else:
+                if validators.get("etag"):
+                    headers["If-None-Match"] = validators["etag"]
+                if validators.get("last_modified"):
+                    headers["If-Modified-Since"] = validators["last_modified"]
+
+            try:
+                resp = get_session().get(
+                    url=url,
+                    params=params,
+                    headers=headers,
+                    stream=True,
+                    timeout=timeout,
+                )
+            except requests.RequestException as e:
+                log.warning(f"Request to {url} failed: {e}")
+                continue
+
+            if resp.status_code == 304 and validators:
+                resp.close()
+                log.info(f"{url} was not modified since the last download. Reusing it.")
+                body, _ = get_stored_download_paths(url, params)
+                return body.open("rb")
+
+            if resp.status_code in RETRY_STATUS_CODES:
+                resp.close()
+                log.warning(
+                    f"Request got response {resp.status_code} -- {resp.reason}."
+                )
+                continue
+
+            if resp.status_code > 299 or resp.status_code < 200:
+                resp.close()
+                log.error(
+                    f"Request got response {resp.status_code} -- {resp.reason}."
+                    " Aborting."
+                )
+                raise Abort
+
+            resumed = resp.status_code == 206 and resp.headers.get(
+                "Content-Range", ""
+            ).startswith(f"bytes {written}-")
+
+            if not resumed:
+                # A new download, or the server could not resume the old one
+                if file is None:
+                    log.info(f"Retrieving response from {url}...")
+                if validators:
+                    # The saved body is out of date
+                    remove_stored_download(url, params)
+                    validators = {}
+                size = int(resp.headers.get("Content-Length", 0))
+                new_validators = {
+                    "url": url,
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "content_length": size or None,
+                    "content_md5": resp.headers.get("Content-MD5"),
+                }
+                storable = (
+                    store
+                    and DOWNLOAD_STORE is not None
+                    and bool(new_validators["etag"] or new_validators["last_modified"])
+                )
+
+                if part is not None and not storable:
+                    # This response cannot be stored, so start over in memory
+                    file.close()
+                    os.remove(part)
+                    file = part = None
+                if file is None and storable:
+                    file = tempfile.NamedTemporaryFile(
+                        dir=DOWNLOAD_STORE, suffix=".part", delete=False
+                    )
+                    part = file.name
+                elif file is None:
+                    file = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+                file.seek(0)
+                file.truncate()
+                written = 0
+
+            desc = "[Unknown file size]" if size == 0 else ""
+            # I add some delay so the logging does not get (too) mangled up.
+            # The download bars are there just to check on very long download tasks,
+            # like from biomart.
+            try:
+                with tqdm.wrapattr(
+                    resp.raw,
+                    "read",
+                    total=size,
+                    initial=written,
+                    desc=desc,
+                    disable=disable,
+                    delay=5,
+                ) as read_raw:
+                    shutil.copyfileobj(read_raw, file)
+            except (urllib3.exceptions.HTTPError, requests.RequestException) as e:
+                written = file.tell()
+                log.warning(f"Connection to {url} dropped after {written} bytes: {e}")
+                continue
+
+            written = file.tell()
+            if size and written < size:
+                log.warning(
+                    f"Download from {url} is incomplete ({written}/{size} bytes)."
+                )
+                continue
+
+            if (size and written > size) or not md5_matches(file, new_validators):
+                log.warning(f"Download from {url} is corrupted. Starting over.")
+                written = 0
+                continue
+
+            break
+        else:
+            log.error(
+                f"Could not download from {url} after {retries} retries. Aborting."
+            )
+            raise Abort
+
+        file.seek(0)
+        new_validators["sha256"] = hashlib.file_digest(file, "sha256").hexdigest()
+
+        if part is not None:
+            file.close()
+            body, validators_path = get_stored_download_paths(url, params)
+            os.replace(part, body)
+            part = None
+            with validators_path.open("w+") as stream:
+                json.dump(new_validators, stream, indent=4)
+            return body.open("rb")
+
+        # Reset the pointer after we've written all the data
+        file.seek(0)
+        return file
+    finally:
+        if part is not None:
+            file.close()
+            os.remove(part)
+
+
+def md5_matches(file: IO[bytes], validators: dict) -> bool:
+    """Check a download against the Content-MD5 sent by the server, if any.
 
-    log.info(f"Retrieving response from {url}...")
-    size = int(resp.headers.get("Content-Length", 0))
+    Args:
+        file (IO[bytes]): The downloaded file.
+        validators (dict): The validators of the download, as saved by `pbar_get`.
 
-    desc = "[Unknown file size]" if size == 0 else ""
-    bytes = BytesIO()
-    # I add some delay so the logging does not get (too) mangled up.
-    # The download bars are there just to check on very long download tasks,
-    # like from biomart.
-    with tqdm.wrapattr(
-        resp.raw, "read", total=size, desc=desc, disable=disable, delay=5
-    ) as read_raw:
-        shutil.copyfileobj(read_raw, bytes)
+    Returns:
+        bool: False if the server sent a Content-MD5 and it does not match.
+    """
+    if not validators["content_md5"]:
+        return True
 
-    # Reset the pointer after we've written all the data
-    bytes.seek(0)
-    return bytes
+    file.seek(0)
+    digest = hashlib.file_digest(file, "md5").digest()
+    file.seek(0, os.SEEK_END)
+    return base64.b64encode(digest).decode("ascii") == validators["content_md5"]
 
 
 def request_cosmic_download_url(url: str, auth_hash: str) -> str:
@@ -101,7 +463,9 @@ def request_cosmic_download_url(url: str, auth_hash: str) -> str:
     Returns:
         str: The valid download url that can actually be requested
     """
-    payload = requests.get(url, headers={"Authorization": f"Basic {auth_hash}"})
+    payload = get_session().get(
+        url, headers={"Authorization": f"Basic {auth_hash}"}, timeout=HTTP_TIMEOUT
+    )
 
     if payload.status_code > 299 or payload.status_code < 200:
         log.error(
@@ -151,13 +515,29 @@ class EnsemblID:
     version_number: Optional[int]
 
 
-ENS_ID_MATCHER = re.compile("ENS(FM|GT|[EGPRT])([0-9]{11})(?:.([0-9]+))?")
+ENS_ID_MATCHER = re.compile(
+    "^ENS(?P<type_letter_prefix>FM|GT|[EGPRT])(?P<identifier>[0-9]{11})"
+    "(?:.(?P<version_number>[0-9]+))?"
+)
 """RE to match any ensembl ID and deconstruct it"""
 
+ENS_ID_TYPES = {
+    "E": "exon",
+    "FM": "protein family",
+    "G": "gene",
+    "GT": "gene tree",
+    "P": "protein",
+    "R": "regulatory feature",
+    "T": "transcript",
+}
+"""The types of ensembl IDs, by their letter prefix"""
+
 
 def split_ensembl_ids(ensembl_id: str) -> EnsemblID:
     """Splits an ensembl ID string into its components
 
+    To split a whole column of IDs, use `split_ensembl_id_column`.
+
     Args:
         ensembl_id (str): The ensembl id to split
     Returns:
@@ -166,16 +546,6 @@ def split_ensembl_ids(ensembl_id: str) -> EnsemblID:
     assert ensembl_id.startswith("ENS"), "The passed string is not a valid ensembl ID."
     assert len(ensembl_id) >= 11, "The passed ensembl ID is too short."
 
-    types = {
-        "E": "exon",
-        "FM": "protein family",
-        "G": "gene",
-        "GT": "gene tree",
-        "P": "protein",
-        "R": "regulatory feature",
-        "T": "transcript",
-    }
-
     match = ENS_ID_MATCHER.match(ensembl_id)
 
     if not match:
@@ -183,7 +553,7 @@ def split_ensembl_ids(ensembl_id: str) -> EnsemblID:
         raise Abort
 
     try:
-        type = types[match.groups()[0]]
+        type = ENS_ID_TYPES[match.groups()[0]]
     except KeyError:
         log.error(
             f"Error: cannot parse ENSEMBL ID. Type {match.groups()[0]} not valid."
@@ -204,6 +574,57 @@ def split_ensembl_ids(ensembl_id: str) -> EnsemblID:
     )
 
 
+def split_ensembl_id_column(ids: pd.Series) -> pd.DataFrame:
+    """Splits a column of ensembl IDs into their components
+
+    The vectorised version of `split_ensembl_ids`, with the same checks. Each
+    unique ID is parsed just once, in a single `str.extract` pass.
+
+    Args:
+        ids (pd.Series): The ensembl IDs to split.
+
+    Raises:
+        AssertionError: If some IDs do not start with "ENS" or are too short.
+        Abort: If some IDs cannot be matched.
+
+    Returns:
+        pd.DataFrame: A frame with the same index as `ids`, and one column for
+        each field of `EnsemblID`. Missing versions are <NA>.
+    """
+    codes, uniques = pd.factorize(ids)
+    assert (codes != -1).all(), "The passed string is not a valid ensembl ID."
+    uniques = pd.Series(uniques, dtype=object)
+
+    assert (
+        uniques.str.startswith("ENS").fillna(False).all()
+    ), "The passed string is not a valid ensembl ID."
+    assert (uniques.str.len() >= 11).all(), "The passed ensembl ID is too short."
+
+    parts = uniques.str.extract(ENS_ID_MATCHER)
+
+    unmatched = parts["identifier"].isna()
+    if unmatched.any():
+        log.error(f"Cannot match IDs {uniques[unmatched].head(10).tolist()}.")
+        raise Abort
+
+    result = pd.DataFrame(
+        {
+            "full_id": uniques,
+            "full_id_no_version": (
+                "ENS" + parts["type_letter_prefix"] + parts["identifier"]
+            ),
+            "type": parts["type_letter_prefix"].map(ENS_ID_TYPES),
+            "type_letter_prefix": parts["type_letter_prefix"],
+            "identifier": parts["identifier"].astype("int64"),
+            "version_number": pd.to_numeric(parts["version_number"]).astype("Int64"),
+        }
+    )
+
+    result = result.take(codes)
+    result.index = ids.index
+    return result
+
+
 def tolerant_is_nan(item: Any) -> bool:
     """Checks if the passed item is NaN with math.isnan() but does not fail if item is not a number"""
     try:
@@ -272,6 +693,140 @@ def to_transaction(data: pd.DataFrame, table: str) -> str:
     return sql
 
 
+@dataclass
+class TablePayload:
+    """Dataclass representing rows to insert in a table of the database.
+
+    Made by `to_payload`, and inserted by `execute_transaction` with batched,
+    parameterized statements, so SQLite does not have to parse the data.
+    """
+
+    table: str
+    columns: list[str]
+    rows: list[tuple]
+
+    @property
+    def statement(self) -> str:
+        """The parameterized INSERT statement for the rows of this payload"""
+        placeholders = ", ".join("?" * len(self.columns))
+        columns = ", ".join(self.columns)
+        return f"INSERT INTO {self.table} ({columns}) VALUES ({placeholders})"
+
+
+NUMPY_SCALARS = (
+    np.bool_,
+    np.int8,
+    np.int16,
+    np.int32,
+    np.int64,
+    np.longlong,
+    np.uint8,
+    np.uint16,
+    np.uint32,
+    np.uint64,
+    np.ulonglong,
+    np.float16,
+    np.float32,
+)
+"""Numpy scalar types that SQLite has to be taught to bind"""
+
+# Without adapters, SQLite would bind numpy scalars as raw bytes (BLOBs), as
+# they support the buffer protocol. np.float64 is a float, so it is fine.
+for numpy_type in NUMPY_SCALARS:
+    sqlite3.register_adapter(numpy_type, lambda x: x.item())
+
+
+def normalise_nulls(data: pd.DataFrame) -> pd.DataFrame:
+    """Collapse NaNs, NAs and "NA" strings to None, and drop all-NULL rows.
+
+    Works column by column, with a few vectorised operations each, so it is
+    fast even for millions of rows. Every parser goes through this (with
+    `to_payload`) before its data is inserted into the database.
+
+    Args:
+        data (pd.DataFrame): The data to normalise
+
+    Returns:
+        pd.DataFrame: A new frame of object columns, with None for the NULLs,
+          and without the rows that are all NULLs.
+    """
+    columns = {}
+    keep = np.zeros(data.shape[0], dtype=bool)
+    # Columns are taken by position, as their names might be duplicated
+    for i in range(data.shape[1]):
+        column = data.iloc[:, i]
+        missing = column.isna().to_numpy()
+        if column.dtype == object:
+            missing = missing | (column == "NA").to_numpy()
+
+        values = column.to_numpy(dtype=object, copy=True)
+        values[missing] = None
+        columns[i] = values
+        keep |= ~missing
+
+    result = pd.DataFrame(columns, index=data.index, dtype=object)
+    result.columns = data.columns
+
+    return result[keep]
+
+
+def to_payload(data: pd.DataFrame, table: str) -> TablePayload:
+    """Convert a dataframe to a payload of rows to insert to a database table
+
+    Like `to_transaction`, but the data is not rendered to a SQL string.
+    The conversion will (see `normalise_nulls`):
+        - Collapse NAs, NaNs and "NA" strings to NULLs
+        - Remove all-NULL lines.
+
+    Args:
+        data (pd.DataFrame): The data to convert
+        table (str): The name of the table to insert the data to
+
+    Returns:
+        TablePayload: The payload, ready for `execute_transaction`.
+    """
+    log.info(
+        f"Converting a {data.shape[0]} rows by {data.shape[1]} cols dataframe to a table payload..."
+    )
+
+    normalised = normalise_nulls(data)
+    rows = list(normalised.itertuples(index=False, name=None))
+
+    return TablePayload(table=table, columns=[str(x) for x in data.columns], rows=rows)
+
+
+PAYLOAD_CHUNK_SIZE = 100_000
+"""Number of rows in each of the payloads made by `to_payloads`"""
+
+
+def to_payloads(
+    data: pd.DataFrame, table: str, chunk_size: int = PAYLOAD_CHUNK_SIZE
+) -> Iterator[TablePayload]:
+    """Convert a dataframe to payloads of rows, one chunk of rows at a time
+
+    Like `to_payload`, but each chunk of `chunk_size` rows is converted only
+    when it is needed, so that the rows of just one chunk are in memory at
+    once. The writer consumes the chunks one by one.
+
+    Args:
+        data (pd.DataFrame): The data to convert
+        table (str): The name of the table to insert the data to
+        chunk_size (int, optional): The number of rows of each chunk. Defaults
+          to `PAYLOAD_CHUNK_SIZE`.
+
+    Yields:
+        TablePayload: The payloads, ready for `execute_transaction`.
+    """
+    log.info(
+        f"Converting a {data.shape[0]} rows by {data.shape[1]} cols dataframe to table payloads in chunks of {chunk_size} rows..."
+    )
+    columns = [str(x) for x in data.columns]
+    for start in range(0, data.shape[0], chunk_size):
+        normalised = normalise_nulls(data.iloc[start : start + chunk_size])
+        rows = list(normalised.itertuples(index=False, name=None))
+        yield TablePayload(table=table, columns=columns, rows=rows)
+
+
 def sanity_check(check: bool, message: str):
     """Run a sanity check - an assertion but with log messages.
 
@@ -292,10 +847,62 @@ def lmap(*args, **kwargs) -> list:
     return list(map(*args, **kwargs))
 
 
+def thread_map(function: Callable, iterable: Iterable, max_workers: int) -> list:
+    """A not-lazy map, run in a pool of threads.
+
+    Meant for functions that mostly wait on the network. The results are in
+    the same order as the inputs, no matter the order in which they finish.
+    If any call fails, the calls that did not start yet are cancelled, and
+    the (first) error is raised.
+
+    Args:
+        function (Callable): The function to call on every item.
+        iterable (Iterable): The items to call the function on.
+        max_workers (int): How many calls to run at the same time, at most.
+
+    Returns:
+        list: The results of the calls.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worker")
+    try:
+        return list(pool.map(function, iterable))
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+INSERT_BATCH_SIZE = 50_000
+"""Number of rows of a TablePayload to give to each `executemany` call"""
+
+
 def execute_transaction(connection, transaction):
-    """Run a transaction on a connection. With logging!"""
-    log.info("Executing transaction...")
-    connection.execute(transaction)
+    """Run a transaction on a connection. With logging!
+
+    The transaction is either a SQL string, or a TablePayload. The rows of
+    payloads are inserted in batches of `INSERT_BATCH_SIZE`, all in one SQL
+    transaction (unless one is already open), so they are all inserted or
+    none are.
+    """
+    if not isinstance(transaction, TablePayload):
+        log.info("Executing transaction...")
+        connection.execute(transaction)
+        return
+
+    log.info(f"Inserting {len(transaction.rows)} rows into '{transaction.table}'...")
+    statement = transaction.statement
+    rows = transaction.rows
+
+    own_transaction = not connection.in_transaction
+    if own_transaction:
+        connection.execute("BEGIN")
+    try:
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            connection.executemany(statement, rows[start : start + INSERT_BATCH_SIZE])
+    except Exception:
+        if own_transaction:
+            connection.execute("ROLLBACK")
+        raise
+    if own_transaction:
+        connection.execute("COMMIT")
 
 
 def print_duplicates(data: pd.DataFrame) -> None:
@@ -484,19 +1091,20 @@ def flatten(l):
     return out
 
 
-def get_local_csv(file_name: str) -> pd.DataFrame:
+def get_local_csv(file_name: str, **kwargs) -> pd.DataFrame:
     """Get a local data file based on its file name.
 
     The local data has to live in the ./manual_data folder and be a .csv file.
 
     Args:
         file_name (str): The name of the file to load.
+        **kwargs: Passed to `pd.read_csv`.
 
     Returns:
         A `pd.DataFrame` with the loaded data.
     """
     with resources.open_text(local_data, file_name) as file:
-        return pd.read_csv(file)
+        return pd.read_csv(file, **kwargs)
 
 
 def get_local_bytes(file_name: str) -> BytesIO:
@@ -542,95 +1150,191 @@ def explode_on(
         pd.DataFrame: The exploded data
     """
 
-    # This works very, very badly, but seems to work
     original_cols = data.columns
     if not columns:
         columns = list(original_cols)
 
-    def conservative_split(x):
-        if isinstance(x, str):
-            return x.split(on)
-        else:
-            return [x]
-
-    def to_list(x):
-        if isinstance(x, list):
-            return x
-        return [x]
-
-    for col in columns:
-        data[col] = data[col].map(conservative_split)
+    def conservative_split(values: pd.Series) -> pd.Series:
+        # Non-string values are left as NaNs, and count as lists of length one
+        if not pd.api.types.is_string_dtype(values.dtype):
+            return pd.Series(np.nan, index=values.index, dtype=object)
+        return values.str.split(on)
+
+    splits = {col: conservative_split(data[col]) for col in columns}
+    lengths = pd.DataFrame(
+        {
+            col: split.str.len().astype("float64").fillna(1).astype("int64")
+            for col, split in splits.items()
+        },
+        index=data.index,
+    )
+    max_lens = lengths.max(axis=1).astype("int64")
 
     # lists in the cols may have different lengths, but as long as they are all
     # either the max or 1, we can still explode
+    incompatible = ((lengths != 1) & lengths.ne(max_lens, axis=0)).any(axis=1)
+    if incompatible.any():
+        i = int(np.argmax(incompatible.to_numpy()))
+        row = [
+            x.split(on) if col in columns and isinstance(x, str) else [x]
+            for col, x in data.iloc[[i]].to_dict("records")[0].items()
+        ]
+        raise AssertionError(f"Cols have incompatible split lengths (row {row})")
+
+    # Each row becomes `max_len` rows. Row `i` takes, in each column, either its
+    # `j`th split value, or its only value if it has just one.
+    max_lens = max_lens.to_numpy()
+    source_rows = np.repeat(np.arange(len(data)), max_lens)
+    offsets = np.arange(len(source_rows)) - np.repeat(
+        np.cumsum(max_lens) - max_lens, max_lens
+    )
+
+    exploded = {}
+    for col in original_cols:
+        if col not in columns:
+            exploded[col] = data[col].to_numpy()[source_rows]
+            continue
+        col_lengths = lengths[col].to_numpy()
+        starts = np.cumsum(col_lengths) - col_lengths
+        # The values that were not split are one (NaN) row each in the explosion
+        values = splits[col].explode().to_numpy(dtype=object, copy=True)
+        unsplit = splits[col].isna().to_numpy()
+        values[starts[unsplit]] = data[col].to_numpy()[unsplit]
+
+        picks = starts[source_rows] + np.where(
+            col_lengths[source_rows] == 1, 0, offsets
+        )
+        exploded[col] = values[picks]
+
+    data = pd.DataFrame(exploded, columns=original_cols)
 
-    new_rows = []
-    for _, row in data.iterrows():
-        row = lmap(to_list, row)
+    return data.drop_duplicates()
 
-        lengths = lmap(len, row)
-        max_len = max(lengths)
 
-        assert all(
-            lmap(lambda x: x == 1 or x == max_len, lengths)
-        ), f"Cols have incompatible split lengths (row {row})"
+THESAURUS_DROP = "$$DROP$$"
+"""The `change_to` of the thesaurus entries that must be dropped"""
 
-        mults = [max_len if x == 1 else 1 for x in lengths]
 
-        row = [x * y for x, y in zip(row, mults)]
+def compile_thesaurus(thesaurus: pd.DataFrame) -> dict[str, tuple[str, ...]]:
+    """Compile the thesaurus to a mapping from each entry to its final values
 
-        new_rows.append(row)
+    Each entry is first replaced by its `change_to`, following chains of them.
+    Then it is split on commas, and its synonyms (and theirs, and so on) are
+    added after it. Entries that end up as `$$DROP$$` map to no values.
 
-    data = pd.DataFrame(new_rows, columns=original_cols)
+    If an entry is in the thesaurus more than once, only its first line counts.
 
-    data = data.explode(column=list(original_cols), ignore_index=True)
+    Args:
+        thesaurus (pd.DataFrame): The thesaurus, with the "original",
+          "change_to" and "synonyms" columns.
 
-    return data.drop_duplicates()
+    Raises:
+        ValueError: If the `change_to`s make a cycle.
+
+    Returns:
+        dict[str, tuple[str, ...]]: The values that each entry becomes, in order
+        and without duplicates.
+    """
+    change_to = {}
+    synonyms = {}
+    for line in thesaurus.dropna(subset="original").itertuples():
+        if not pd.isna(line.change_to):
+            change_to.setdefault(line.original, line.change_to)
+        if not pd.isna(line.synonyms):
+            synonyms.setdefault(line.original, line.synonyms)
+
+    def resolve(value: str) -> str:
+        chain = [value]
+        while change_to.get(value, value) != value:
+            value = change_to[value]
+            if value in chain:
+                chain = " -> ".join(chain + [value])
+                raise ValueError(f"The thesaurus has a cycle of 'change_to's: {chain}")
+            chain.append(value)
+        return value
+
+    def expand(value: str, parents: frozenset[str]) -> list[str]:
+        value = resolve(value)
+        if value == THESAURUS_DROP:
+            return []
+        pieces = value.split(",")
+        if value in synonyms:
+            pieces.extend(synonyms[value].split(","))
+        if pieces == [value]:
+            return [value]
+
+        # The entries that are already being expanded are just kept, so that
+        # synonyms of each other do not recurse forever
+        parents = parents | {value}
+        values = []
+        for piece in pieces:
+            if piece == value or piece in parents:
+                values.append(piece)
+            else:
+                values.extend(expand(piece, parents))
+
+        return list(dict.fromkeys(values))
+
+    return {
+        entry: tuple(expand(entry, frozenset()))
+        for entry in set(change_to) | set(synonyms) | {THESAURUS_DROP}
+    }
 
 
-def apply_thesaurus(frame: pd.DataFrame, col="carried_solute") -> pd.DataFrame:
+THESAURUS = compile_thesaurus(
+    # Some entries (e.g. "nan") would be read as NaNs by default
+    get_local_csv(THESAURUS_FILE, keep_default_na=False, na_values=[""])
+)
+"""The compiled (see `compile_thesaurus`) local thesaurus"""
+
+
+def apply_thesaurus(
+    frame: pd.DataFrame,
+    col="carried_solute",
+    thesaurus: dict[str, tuple[str, ...]] = THESAURUS,
+) -> pd.DataFrame:
     """Apply the thesaurus on a dataframe,
 
     Optionally specify which col has the carried solute information
 
+    Values are split on commas, so each of their pieces is looked up in the
+    thesaurus, and every row is exploded to the values its entry maps to. Rows
+    whose entry is dropped by the thesaurus are removed.
+
     Args:
         frame (pd.DataFrame): The frame to act upon
         col (str, optional): The col to act upon. Defaults to "carried_solute".
+        thesaurus (dict[str, tuple[str, ...]], optional): The compiled
+          thesaurus to apply. Defaults to `THESAURUS`.
 
     Returns:
         pd.DataFrame: The (exploded) frame with the synonyms
     """
-    original_data = frame.copy()
-    thesaurus = get_local_csv(THESAURUS_FILE)
-    # First, replace every entry with its "change_to" equivalent
-    change_to = thesaurus.dropna(axis=0, subset="change_to")
-
-    rows, _ = frame.shape
-
     log.info("Applying thesaurus...")
-    for _, line in change_to.iterrows():
-        frame.loc[frame[col] == line["original"], col] = line["change_to"]
-
-    # Drop values that need to be dropped
-    frame = frame[~(frame[col].isin(["$$DROP$$"]))]
-    log.debug(f"Dropped {rows - frame.shape[0]} rows.")
-
-    synonyms = thesaurus.dropna(axis=0, subset="synonyms")
-    for _, line in synonyms.iterrows():
-        frame.loc[
-            frame[col] == line["original"], col
-        ] = f"{line['original']},{line['synonyms']}"
-
-    new_frame = explode_on(frame, ",", [col])
-
-    log.info(f"Thesaurus # rows change: {new_frame.shape[0] - rows}")
 
-    if original_data.equals(new_frame):
-        log.info("Completed application of the Thesaurus")
-        return new_frame
-    else:
-        log.info("Thesaurus changed some data. Re-applying...")
-        return apply_thesaurus(new_frame, col=col)
+    def lookup(value: Any) -> list:
+        if not isinstance(value, str):
+            return [value]
+        if value in thesaurus:
+            return list(thesaurus[value])
+        values = []
+        for piece in value.split(","):
+            values.extend(thesaurus.get(piece, (piece,)))
+        return list(dict.fromkeys(values))
+
+    # Look up each distinct value just once
+    mapping = {value: lookup(value) for value in frame[col].dropna().unique()}
+    dropped = [value for value, values in mapping.items() if not values]
+    kept = ~frame[col].isin(dropped)
+    log.debug(f"Dropped {(~kept).sum()} rows.")
+
+    values = frame.loc[kept, col].map(mapping, na_action="ignore")
+    new_frame = frame.loc[kept].assign(**{col: values}).explode(col)
+    new_frame = new_frame.drop_duplicates(ignore_index=True)
+
+    log.info(f"Thesaurus # rows change: {new_frame.shape[0] - frame.shape[0]}")
+
+    return new_frame
 
 
 def is_identical(df_col: pd.DataFrame) -> bool:
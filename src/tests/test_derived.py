@@ -0,0 +1,106 @@
+import pandas as pd
+
+from daedalus.derived import derive_biomart_ids, derive_iuphar_ensg, join_iuphar_ensg
+from daedalus.shards import read_shard, write_shard
+
+
+def mart_data():
+    return {
+        "IDs": pd.DataFrame(
+            {
+                "gene_stable_id_version": [
+                    "ENSG00000000003.15",
+                    "ENSG00000000003.15",
+                    "ENSG00000000005.6",
+                    "ENSG00000000005.6",
+                ],
+                "transcript_stable_id_version": [
+                    "ENST00000000001.2",
+                    "ENST00000000002.1",
+                    "ENST00000000003.1",
+                    "ENST00000000003.1",
+                ],
+            }
+        ),
+        "proteins": pd.DataFrame(
+            {
+                "transcript_stable_id_version": ["ENST00000000001.2"] * 2,
+                "protein_stable_id_version": ["ENSP00000000001.2"] * 2,
+                "pdb_id": ["1ABC", "2ABC"],
+                "refseq_mrna_id": ["NM_000001", "NM_000001"],
+                "refseq_peptide_id": ["NP_000001", "NP_000001"],
+            }
+        ),
+        "gene_names": pd.DataFrame(
+            {
+                "hgnc_id": ["HGNC:1"],
+                "hgnc_symbol": ["ABC"],
+                "gene_description": ["A gene"],
+                "gene_stable_id_version": ["ENSG00000000003.15"],
+            }
+        ),
+    }
+
+
+def test_derive_biomart_ids(tmp_path):
+    derived = derive_biomart_ids(mart_data())
+
+    assert derived["genes"].to_dict("list") == {
+        "ensg_version": ["ENSG00000000003.15", "ENSG00000000005.6"],
+        "ensg": ["ENSG00000000003", "ENSG00000000005"],
+        "ensg_version_leaf": [15, 6],
+    }
+    assert derived["transcripts"].to_dict("list") == {
+        "ensg": ["ENSG00000000003", "ENSG00000000003", "ENSG00000000005"],
+        "enst": ["ENST00000000001", "ENST00000000002", "ENST00000000003"],
+        "enst_version": [
+            "ENST00000000001.2",
+            "ENST00000000002.1",
+            "ENST00000000003.1",
+        ],
+        "enst_version_leaf": [2, 1, 1],
+    }
+    assert derived["proteins"]["enst"].tolist() == ["ENST00000000001"] * 2
+    assert derived["proteins"]["ensp"].tolist() == ["ENSP00000000001"] * 2
+    assert derived["gene_names"]["ensg"].tolist() == ["ENSG00000000003"]
+
+    # The derived data is cached like all other data
+    loaded = read_shard(tmp_path, write_shard(tmp_path, "biomart_ids", derived))
+    for key, frame in derived.items():
+        assert loaded[key].equals(frame)
+
+
+def test_iuphar_ensg():
+    iuphar = {
+        "database_link": pd.DataFrame(
+            {
+                "object_id": ["2", "1", "1", "3", "4"],
+                "database_id": ["15", "15", "15", "15", "1"],
+                "species_id": ["1", "1", "1", "2", "1"],
+                "placeholder": [
+                    "ENSG00000000002",
+                    "ENSG00000000001",
+                    "ENSG00000000001",
+                    "ENSMUSG00000000003",
+                    "P12345",
+                ],
+            }
+        )
+    }
+
+    iuphar_ensg = derive_iuphar_ensg(iuphar)
+
+    # Only human Ensembl links are kept, once, and sorted by object ID
+    assert iuphar_ensg.index.tolist() == [1, 2]
+    assert iuphar_ensg.loc[2, "ensg"] == "ENSG00000000002"
+
+    data = pd.DataFrame({"object_id": ["1", "3"], "value": ["a", "b"]})
+    assert join_iuphar_ensg(data, iuphar_ensg).to_dict("list") == {
+        "object_id": [1],
+        "value": ["a"],
+        "ensg": ["ENSG00000000001"],
+    }
+    assert join_iuphar_ensg(data, iuphar_ensg, how="left")["ensg"].isna().tolist() == [
+        False,
+        True,
+    ]
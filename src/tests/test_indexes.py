@@ -0,0 +1,101 @@
+import sqlite3
+
+import pytest
+
+from daedalus.indexes import (
+    IndexSpec,
+    advise_indexes,
+    create_indexes,
+    find_scans,
+    get_index_specs,
+    get_workload,
+)
+from daedalus.make_db import make_empty
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.executescript(
+        """
+        CREATE TABLE genes (ensg TEXT PRIMARY KEY, symbol TEXT);
+        CREATE TABLE carriers (ensg TEXT, carried_solute TEXT, rate REAL);
+        """
+    )
+    yield connection
+    connection.close()
+
+
+def get_index_names(connection):
+    indexes = connection.execute(
+        "SELECT name FROM sqlite_schema WHERE type = 'index';"
+    ).fetchall()
+    return {x[0] for x in indexes}
+
+
+def test_index_spec():
+    spec = IndexSpec("carriers", ("carried_solute", "ensg"))
+
+    assert spec.name == "carriers_carried_solute_ensg_index"
+    assert spec.statement == (
+        'CREATE INDEX IF NOT EXISTS "carriers_carried_solute_ensg_index"'
+        ' ON "carriers" ("carried_solute", "ensg");'
+    )
+
+
+def test_create_indexes(connection):
+    specs = get_index_specs(connection, id_cols=["ensg"])
+    assert IndexSpec("genes", ("ensg",)) in specs
+    assert IndexSpec("carriers", ("ensg",)) in specs
+
+    create_indexes(connection, specs)
+
+    # The primary key of 'genes' is already indexed
+    assert get_index_names(connection) == {
+        "sqlite_autoindex_genes_1",
+        "carriers_ensg_index",
+    }
+
+
+def test_find_scans(connection):
+    query = (
+        "SELECT g.symbol FROM carriers AS c JOIN genes g ON c.ensg = g.ensg"
+        " WHERE c.carried_solute = 'K+'"
+    )
+
+    assert find_scans(connection, query) == ["carriers"]
+    assert find_scans(connection, "SELECT * FROM genes WHERE ensg = 'A'") == []
+
+
+def test_advise_indexes(connection):
+    workload = [
+        "SELECT ensg FROM carriers WHERE carried_solute = 'K+'",
+        "SELECT ensg FROM genes WHERE symbol LIKE 'GJ%'",
+        "SELECT symbol FROM genes WHERE ensg = 'A'",
+    ]
+
+    advice = advise_indexes(connection, workload, specs=[])
+
+    assert [x.query for x in advice] == workload[:2]
+    # The covering index is preferred
+    assert advice[0].scans == ["carriers"]
+    assert advice[0].indexes == [IndexSpec("carriers", ("carried_solute", "ensg"))]
+    # No index can avoid scanning for a LIKE
+    assert advice[1].scans == ["genes"]
+    assert advice[1].indexes == []
+    # The database itself is left untouched
+    assert get_index_names(connection) == {"sqlite_autoindex_genes_1"}
+
+
+def test_workload_is_valid():
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    make_empty(connection)
+    create_indexes(connection, get_index_specs(connection))
+
+    workload = get_workload()
+    assert len(workload) > 0
+
+    advice = advise_indexes(connection, workload)
+    # The declared indexes serve the filters on the solutes and tissues
+    for item in advice:
+        assert not {"channels", "origin", "solute_carriers"} & set(item.scans)
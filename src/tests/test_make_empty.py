@@ -1,8 +1,25 @@
+import logging
+import sqlite3
+from functools import partial
+from io import StringIO
+from pathlib import Path
 from sqlite3 import Cursor
 
+import pandas as pd
 import pytest
 
-from daedalus.make_db import make_empty
+from daedalus.errors import Abort
+from daedalus.make_db import (
+    BUILD_PAGE_SIZE,
+    Daedalus,
+    finalize_database,
+    get_wrapper,
+    make_empty,
+    save_database,
+    set_build_mode,
+)
+from daedalus.retrievers import ResourceCache
+from daedalus.utils import TablePayload
 from tests.fixtures import *
 
 
@@ -48,3 +65,226 @@ def test_make_empty(session: Cursor):
         test_schema = test_schema.fetchall()
 
     assert test_schema == expected_schema
+
+
+def test_needed_keys():
+    daedalus = Daedalus(connection=None, cache=None)
+
+    assert daedalus.needed_keys(
+        [x for x in daedalus.runners if x not in ["gene_ids", "tcdb_ids"]]
+    ) == ["biomart_ids", "tcdb"]
+    assert "cosmic" not in daedalus.needed_keys(["cosmic"])
+    assert daedalus.consumers(["function", "structure"])["iuphar"] == 2
+
+
+def get_number_transaction(number: int) -> str:
+    if number == 3:
+        raise ValueError("Three is not allowed")
+    return f"INSERT INTO numbers VALUES ({number});"
+
+
+def get_chunked_transaction(numbers: list[int]):
+    for number in numbers:
+        if number == 13:
+            raise ValueError("Thirteen is not allowed")
+        yield TablePayload(table="numbers", columns=["number"], rows=[(number,)])
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_jobs(tmp_path, jobs):
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.execute("CREATE TABLE numbers (number INTEGER);")
+    cache = ResourceCache(tmp_path / "cache", {})
+
+    daedalus = Daedalus(connection, cache)
+    daedalus.runners = {
+        str(i): partial(
+            get_wrapper,
+            get_number_transaction,
+            cache=cache,
+            cache_args={},
+            other_args={"number": i},
+        )
+        for i in range(6)
+    }
+    for name, numbers in {"chunked": [10, 11], "broken": [12, 13]}.items():
+        daedalus.runners[name] = partial(
+            get_wrapper,
+            get_chunked_transaction,
+            cache=cache,
+            cache_args={},
+            other_args={"numbers": numbers},
+        )
+
+    # The failures are collected, and raised only at the end
+    with pytest.raises(Abort):
+        daedalus.run(to_skip=["5"], jobs=jobs)
+
+    numbers = connection.execute("SELECT number FROM numbers;").fetchall()
+    # Runners that fail halfway through do not write anything
+    assert numbers == [(0,), (1,), (2,), (4,), (10,), (11,)]
+
+
+def get_started_transaction(number: int, folder: Path):
+    # Leave a trace of the start of the runner, that the parent can see
+    (folder / str(number)).touch()
+    if number % 2:
+        return f"INSERT INTO numbers VALUES ({number});"
+    return (
+        TablePayload(table="numbers", columns=["number"], rows=[(number + x,)])
+        for x in range(0, 300, 100)
+    )
+
+
+def test_run_in_pool_is_bounded(tmp_path, monkeypatch):
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.execute("CREATE TABLE numbers (number INTEGER);")
+    cache = ResourceCache(tmp_path / "cache", {})
+
+    daedalus = Daedalus(connection, cache)
+    daedalus.runners = {
+        str(i): partial(
+            get_wrapper,
+            get_started_transaction,
+            cache=cache,
+            cache_args={},
+            other_args={"number": i, "folder": tmp_path},
+        )
+        for i in range(8)
+    }
+
+    write = daedalus.write
+    pending = []
+
+    def counting_write(transactions):
+        # The runners that started, but whose outcome was not taken yet
+        taken = len(pending) + 1
+        pending.append(len([x for x in tmp_path.iterdir() if x.is_file()]) - taken)
+        write(transactions)
+
+    monkeypatch.setattr(daedalus, "write", counting_write)
+    daedalus.run(jobs=2)
+
+    assert len(pending) == 8
+    assert max(pending) <= 2
+    numbers = connection.execute("SELECT number FROM numbers;").fetchall()
+    assert sorted(x[0] for x in numbers) == sorted(
+        [x for x in range(1, 8, 2)]
+        + [x + y for x in range(0, 8, 2) for y in (0, 100, 200)]
+    )
+
+
+def get_logged_transaction() -> str:
+    logging.getLogger("daedalus.parsers.fake").warning("Logged from a worker")
+    return "INSERT INTO numbers VALUES (1);"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_run_jobs_logs(tmp_path, jobs):
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.execute("CREATE TABLE numbers (number INTEGER);")
+    cache = ResourceCache(tmp_path / "cache", {})
+
+    daedalus = Daedalus(connection, cache)
+    daedalus.runners = {
+        "logged": partial(
+            get_wrapper, get_logged_transaction, cache=cache, cache_args={}
+        )
+    }
+
+    stream = StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setLevel(logging.WARNING)
+    logging.getLogger("daedalus").addHandler(handler)
+    try:
+        daedalus.run(jobs=jobs)
+    finally:
+        logging.getLogger("daedalus").removeHandler(handler)
+
+    # The logs of the runners reach the handlers, in any process
+    assert "Logged from a worker" in stream.getvalue()
+    # Handlers still filter by their own level
+    assert "Running logged" not in stream.getvalue()
+
+
+def get_lists():
+    return {"frame": pd.DataFrame({"a": [["x"], ["y"]]})}
+
+
+def get_mutating_chunks(data: dict):
+    for value in data["frame"]["a"]:
+        # Copy-on-write cannot protect mutable values inside the frames
+        value.append("z")
+        yield TablePayload(table="numbers", columns=["number"], rows=[(1,)])
+
+
+def test_run_strict_chunks(tmp_path):
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    connection.execute("CREATE TABLE numbers (number INTEGER);")
+    cache = ResourceCache(tmp_path / "cache", {"lists": get_lists}, strict=True)
+
+    daedalus = Daedalus(connection, cache)
+    # The chunked runner is the last (and only) consumer of its key, so the
+    # key is released only after its chunks are written and verified
+    daedalus.runners = {
+        "chunked": partial(
+            get_wrapper,
+            get_mutating_chunks,
+            cache=cache,
+            cache_args={"data": "lists"},
+        )
+    }
+
+    with pytest.raises(Abort):
+        daedalus.run()
+
+    assert connection.execute("SELECT * FROM numbers;").fetchall() == []
+    assert "lists" not in cache._ResourceCache__data
+
+
+def test_build_mode(tmp_path):
+    connection = sqlite3.connect(tmp_path / "db.sqlite", isolation_level=None)
+    set_build_mode(connection)
+    connection.execute("CREATE TABLE numbers (number INTEGER);")
+    connection.execute("CREATE INDEX numbers_index ON numbers (number);")
+
+    def pragma(name):
+        return connection.execute(f"PRAGMA {name};").fetchone()[0]
+
+    assert pragma("page_size") == BUILD_PAGE_SIZE
+    assert pragma("journal_mode") == "memory"
+    assert pragma("synchronous") == 0
+
+    # Failed runners can still be rolled back
+    connection.execute("BEGIN;")
+    connection.execute("INSERT INTO numbers VALUES (1);")
+    connection.execute("ROLLBACK;")
+    assert connection.execute("SELECT * FROM numbers;").fetchall() == []
+
+    connection.executemany("INSERT INTO numbers VALUES (?);", [(1,), (2,)])
+    finalize_database(connection)
+
+    assert pragma("journal_mode") == "delete"
+    assert pragma("synchronous") == 2
+    assert pragma("page_size") == BUILD_PAGE_SIZE
+    stats = connection.execute("SELECT tbl FROM sqlite_stat1;").fetchall()
+    assert stats == [("numbers",)]
+    connection.close()
+
+
+def test_save_database(tmp_path):
+    connection = sqlite3.connect(":memory:", isolation_level=None)
+    set_build_mode(connection)
+    connection.execute("CREATE TABLE numbers (number INTEGER);")
+    connection.executemany("INSERT INTO numbers VALUES (?);", [(1,), (2,)])
+
+    path = tmp_path / "db.sqlite.tmp"
+    path.write_text("Left over by a failed build")
+    save_database(connection, path)
+    connection.close()
+
+    saved = sqlite3.connect(path)
+    assert saved.execute("SELECT * FROM numbers;").fetchall() == [(1,), (2,)]
+    assert saved.execute("PRAGMA page_size;").fetchone()[0] == BUILD_PAGE_SIZE
+    assert saved.execute("PRAGMA journal_mode;").fetchone()[0] == "delete"
+    saved.close()
@@ -1,6 +1,9 @@
+import pandas as pd
 import pytest
 
+from daedalus.errors import Abort, CacheMutationError
 from daedalus.retrievers import (
+    IUPHARGobbler,
     ResourceCache,
     retrieve_biomart,
     retrieve_cosmic_genes,
@@ -69,17 +72,258 @@ def dummy():
     return "Dummy data"
 
 
-def test_cache():
+def test_cache(tmp_path):
     keys = {"dummy1": dummy, "dummy2": dummy}
 
-    cache_obj = ResourceCache(keys)
-
-    assert cache_obj._ResourceCache__data == {}
+    cache_obj = ResourceCache(tmp_path / "cache", keys)
 
     with cache_obj("dummy1") as mock_data:
         assert mock_data == "Dummy data"
 
-    assert cache_obj._ResourceCache__data == {
-        "dummy1": "Dummy data",
-        "dummy2": "Dummy data",
-    }
+    assert cache_obj.is_stored("dummy1")
+    # Only the keys that are used are retrieved
+    assert not cache_obj.is_stored("dummy2")
+    assert (tmp_path / "cache" / ResourceCache.MANIFEST_NAME).exists()
+
+
+def other_dummy():
+    return "Other dummy data"
+
+
+def test_cache_lazy_loading(tmp_path):
+    ResourceCache(tmp_path / "cache", {"lazy1": dummy, "lazy2": dummy}).populate()
+
+    # Nothing should be retrieved again, and only what we use should be loaded
+    keys = {"lazy1": failing_dummy, "lazy2": failing_dummy}
+    cache_obj = ResourceCache(tmp_path / "cache", keys)
+
+    with cache_obj("lazy1") as mock_data:
+        assert mock_data == "Dummy data"
+
+    assert "lazy1" in cache_obj._ResourceCache__data
+    assert "lazy2" not in cache_obj._ResourceCache__data
+
+
+def test_cache_invalidate(tmp_path):
+    ResourceCache(tmp_path / "cache", {"inv1": dummy, "inv2": dummy}).populate()
+
+    keys = {"inv1": other_dummy, "inv2": failing_dummy}
+    cache_obj = ResourceCache(tmp_path / "cache", keys)
+    cache_obj.invalidate(["inv1"])
+    cache_obj.populate()
+
+    with cache_obj("inv1") as mock_data:
+        assert mock_data == "Other dummy data"
+
+    with pytest.raises(Abort):
+        cache_obj.invalidate(["not_a_key"])
+
+
+def failing_dummy():
+    raise RuntimeError("Dummy failure")
+
+
+def test_cache_concurrent_populate(tmp_path):
+    keys = {"concurrent1": dummy, "concurrent2": dummy}
+
+    cache_obj = ResourceCache(tmp_path / "cache", keys, download_jobs=2)
+    cache_obj.populate()
+
+    with cache_obj("concurrent2") as mock_data:
+        assert mock_data == "Dummy data"
+
+
+def test_cache_concurrent_populate_aborts(tmp_path):
+    keys = {"concurrent_ok": dummy, "concurrent_fail": failing_dummy}
+
+    cache_obj = ResourceCache(tmp_path / "cache", keys, download_jobs=2)
+
+    with pytest.raises(Abort):
+        cache_obj.populate()
+
+    assert cache_obj.is_stored("concurrent_ok")
+    assert not cache_obj.is_stored("concurrent_fail")
+
+
+def test_iuphar_gobbler():
+    dump = [
+        b"SET client_encoding = 'UTF8';\n",
+        b"COPY public.selectivity (selectivity_id, ligand_id, species) FROM stdin;\n",
+        b"1\t\\N\tHuman\n",
+        b"2\t12\t\n",
+        b"\\.\n",
+        b"COPY public.ligand (ligand_id) FROM stdin;\n",
+        b"not\ta\tvalid\tline\n",
+        b"\\.\n",
+    ]
+
+    gobbler = IUPHARGobbler(wanted=["selectivity"])
+    for line in dump:
+        gobbler.gobble(line)
+
+    assert list(gobbler.tables.keys()) == ["public.selectivity"]
+    assert gobbler.tables["public.selectivity"].values.tolist() == [
+        ["1", None, "Human"],
+        ["2", "12", ""],
+    ]
+
+    # Lines that do not fit the table are still an error
+    gobbler = IUPHARGobbler()
+    gobbler.gobble(dump[1])
+    with pytest.raises(RuntimeError):
+        gobbler.gobble(dump[6])
+
+
+def test_cache_populate_some_keys(tmp_path):
+    keys = {"some1": dummy, "some2": failing_dummy}
+    cache_obj = ResourceCache(tmp_path / "cache", keys)
+
+    cache_obj.populate(["some1", "not_a_hook"])
+
+    assert cache_obj.is_stored("some1")
+    assert not cache_obj.is_stored("some2")
+
+
+def frame_dummy():
+    return {"frame": pd.DataFrame({"a": [1, 2], "b": [["x"], ["y"]]})}
+
+
+def test_cache_hands_out_views(tmp_path):
+    cache_obj = ResourceCache(tmp_path / "cache", {"views": frame_dummy})
+
+    with cache_obj("views") as data:
+        frame = data["frame"]
+        frame["a"] = [3, 4]
+        frame.loc[0, "b"] = "z"
+        frame["c"] = 0
+        data["new"] = frame
+
+    with cache_obj("views") as data:
+        assert list(data.keys()) == ["frame"]
+        assert data["frame"].equals(frame_dummy()["frame"])
+
+
+def test_cache_strict(tmp_path):
+    cache_obj = ResourceCache(tmp_path / "cache", {"strict": frame_dummy}, strict=True)
+
+    with cache_obj("strict") as data:
+        data["frame"]["a"] = [3, 4]
+    cache_obj.verify()
+
+    # Copy-on-write cannot protect mutable values inside the frames
+    with cache_obj("strict") as data:
+        data["frame"]["b"][0].append("z")
+    with pytest.raises(CacheMutationError):
+        cache_obj.verify()
+
+
+def test_cache_release(tmp_path):
+    cache_obj = ResourceCache(tmp_path / "cache", {"released": frame_dummy})
+    cache_obj.add_consumers({"released": 2})
+
+    with cache_obj("released"):
+        pass
+    cache_obj.release(["released"])
+    assert "released" in cache_obj._ResourceCache__data
+
+    cache_obj.release(["released"])
+    assert "released" not in cache_obj._ResourceCache__data
+
+    # The data is still on disk
+    with cache_obj("released") as data:
+        assert data["frame"].equals(frame_dummy()["frame"])
+
+
+def test_cache_consumers_are_per_instance(tmp_path):
+    cache_obj = ResourceCache(tmp_path / "cache", {"counted": frame_dummy})
+    other_obj = ResourceCache(tmp_path / "other", {"counted": frame_dummy})
+
+    cache_obj.add_consumers({"counted": 3})
+
+    assert cache_obj._ResourceCache__consumers == {"counted": 3}
+    assert other_obj._ResourceCache__consumers == {}
+
+
+def test_cache_data_is_per_instance(tmp_path):
+    cache_obj = ResourceCache(tmp_path / "cache", {"shared": dummy})
+    other_obj = ResourceCache(tmp_path / "other", {"shared": other_dummy})
+
+    with cache_obj("shared") as data:
+        assert data == "Dummy data"
+    with other_obj("shared") as data:
+        assert data == "Other dummy data"
+
+    other_obj.drop("shared")
+    assert "shared" in cache_obj._ResourceCache__data
+
+
+def test_cache_memory_budget(tmp_path):
+    keys = {"budget1": frame_dummy, "budget2": frame_dummy}
+    cache_obj = ResourceCache(tmp_path / "cache", keys, max_memory=1)
+
+    with cache_obj("budget1"):
+        pass
+    with cache_obj("budget2"):
+        pass
+
+    assert "budget1" not in cache_obj._ResourceCache__data
+    assert "budget2" in cache_obj._ResourceCache__data
+
+
+def small_frame():
+    return pd.DataFrame({"a": [1, 2]})
+
+
+def large_frames():
+    return {"frame": pd.DataFrame({"a": range(10_000)})}
+
+
+def test_cache_memory_budget_lazy(tmp_path):
+    keys = {"small": small_frame, "large": large_frames}
+    cache_obj = ResourceCache(tmp_path / "cache", keys, max_memory=10_000)
+    cache_obj.populate()
+    # Load the data from disk, as in a later run
+    cache_obj = ResourceCache(tmp_path / "cache", keys, max_memory=10_000)
+
+    with cache_obj("small"):
+        pass
+    with cache_obj("large") as data:
+        # Nothing of the large key is in memory until its frames are read
+        assert "small" in cache_obj._ResourceCache__data
+        data["frame"]
+        assert "small" not in cache_obj._ResourceCache__data
+
+    assert "large" in cache_obj._ResourceCache__data
+
+
+def test_cache_derived_keys(tmp_path):
+    calls = []
+
+    def derive(data):
+        calls.append(data)
+        return data.upper()
+
+    hooks = {"base": dummy}
+    derived = {"derived": ("base", derive)}
+    cache_obj = ResourceCache(tmp_path / "cache", hooks, derived=derived)
+
+    with cache_obj("derived") as data:
+        assert data == "DUMMY DATA"
+    assert cache_obj.is_stored("base") and cache_obj.is_stored("derived")
+    # Nobody else needs the base data, so it is not kept in memory
+    assert "base" not in cache_obj._ResourceCache__data
+
+    # The derived data is computed just once...
+    cache_obj = ResourceCache(tmp_path / "cache", hooks, derived=derived)
+    with cache_obj("derived") as data:
+        assert data == "DUMMY DATA"
+    assert len(calls) == 1
+
+    # ... unless the base data changes
+    hooks = {"base": other_dummy}
+    cache_obj = ResourceCache(tmp_path / "cache", hooks, derived=derived)
+    cache_obj.invalidate(["base"])
+    assert not cache_obj.is_stored("derived")
+    with cache_obj("derived") as data:
+        assert data == "OTHER DUMMY DATA"
+    assert len(calls) == 2
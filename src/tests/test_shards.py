@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from daedalus.shards import (
+    LazyDataDict,
+    read_columns,
+    read_frame,
+    read_shard,
+    write_frame,
+    write_shard,
+)
+
+
+def test_columnar_round_trip(tmp_path):
+    data = {
+        "with_none": pd.DataFrame(
+            {"object_id": ["1", "2", None], "median": [None, "0.5", "1"]}
+        ),
+        "with_nan": pd.DataFrame(
+            {"gene": ["A", np.nan, "C"], "value": [1.0, 2.0, 3.5]}
+        ),
+        "mixed": pd.DataFrame({"mixed": ["a", 1, None]}),
+    }
+
+    entry = write_shard(tmp_path, "key", data)
+    assert entry["frames"]["with_none"]["format"] == "parquet"
+    assert entry["frames"]["mixed"]["format"] == "pickle"
+
+    loaded = read_shard(tmp_path, entry)
+    assert isinstance(loaded, LazyDataDict)
+    assert list(loaded.keys()) == ["with_none", "with_nan", "mixed"]
+
+    for key, frame in data.items():
+        assert loaded[key].equals(frame)
+
+    # The kind of missing values is preserved
+    assert loaded["with_none"]["object_id"][2] is None
+    assert isinstance(loaded["with_nan"]["gene"][1], float)
+
+
+def test_columnar_single_frame(tmp_path):
+    # Frames made by concatenation have duplicated indexes
+    frame = pd.concat([pd.DataFrame({"a": ["x", "y"]}), pd.DataFrame({"a": ["z"]})])
+
+    loaded = read_shard(tmp_path, write_shard(tmp_path, "slc", frame))
+
+    assert loaded.equals(frame)
+    assert loaded.index.tolist() == [0, 1, 0]
+
+
+def test_columnar_read_columns(tmp_path):
+    data = {"frame": pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})}
+
+    loaded = read_shard(tmp_path, write_shard(tmp_path, "key", data))
+
+    assert loaded.read("frame", columns=["b"]).columns.tolist() == ["b"]
+    assert read_columns(loaded, "frame", ["b"]).columns.tolist() == ["b"]
+    # Reading some columns does not load the whole frame
+    assert loaded.memo == {}
+
+    assert read_columns(data, "frame", ["a"]).equals(data["frame"][["a"]])
+
+
+def test_columnar_dtypes(tmp_path):
+    frame = pd.DataFrame(
+        {
+            "count": pd.array([1, None], dtype="Int64"),
+            "kind": pd.Categorical(["a", "b"]),
+        }
+    )
+    schema = write_frame(frame, tmp_path / "frame.parquet")
+
+    # Files without the pandas metadata still give back the same types
+    table = pq.read_table(tmp_path / "frame.parquet")
+    pq.write_table(table.replace_schema_metadata(None), tmp_path / "bare.parquet")
+
+    assert read_frame(tmp_path / "bare.parquet", schema).dtypes.equals(frame.dtypes)
+
+
+def test_other_data_is_pickled(tmp_path):
+    data = {"term": ["ENSG00000000001", "ENSG00000000002"]}
+
+    entry = write_shard(tmp_path, "GO", data)
+
+    assert entry["format"] == "pickle"
+    assert read_shard(tmp_path, entry) == data
+
+
+def test_views_do_not_share_changes(tmp_path):
+    data = {"frame": pd.DataFrame({"a": [1, 2]})}
+    loaded = read_shard(tmp_path, write_shard(tmp_path, "key", data))
+
+    view = loaded.view()
+    view["frame"]["a"] = [3, 4]
+
+    assert view["frame"]["a"].tolist() == [3, 4]
+    assert loaded.view()["frame"].equals(data["frame"])
@@ -1,3 +1,8 @@
+import sqlite3
+
+import pytest
+
+from daedalus.errors import Abort
 from daedalus.utils import *  # nopycln: import
 from tests.fixtures import secrets
 
@@ -38,6 +43,29 @@ def test_parse_ensembl_ids():
         assert result.version_number == value["ver"]
 
 
+def test_parse_ensembl_id_column():
+    ids = pd.Series(
+        ["ENSG12345678912.12", "ENST12345678912", "ENSG12345678912.12"],
+        index=[3, 1, 2],
+    )
+
+    result = split_ensembl_id_column(ids)
+
+    assert result.index.tolist() == [3, 1, 2]
+    for i, value in ids.items():
+        expected = split_ensembl_ids(value)
+        assert result.loc[i, "full_id"] == expected.full_id
+        assert result.loc[i, "full_id_no_version"] == expected.full_id_no_version
+        assert result.loc[i, "type"] == expected.type
+        assert result.loc[i, "identifier"] == expected.identifier
+    assert result["version_number"].tolist() == [12, pd.NA, 12]
+
+    with pytest.raises(AssertionError):
+        split_ensembl_id_column(pd.Series(["ENSG12345678912", "XENS12345678912"]))
+    with pytest.raises(Abort):
+        split_ensembl_id_column(pd.Series(["ENSX12345678912"]))
+
+
 def test_explode_on():
     original = pd.DataFrame(
         {"a": ["abb:acc", "abb", "acc:abb"], "b": ["kkk", "kkk:lll", "lll"]}
@@ -51,16 +79,26 @@ def test_explode_on():
     assert explode_on(original, on=":").equals(exploded)
 
 
+def test_explode_on_incompatible_lengths():
+    original = pd.DataFrame({"a": ["abb:acc", "abb"], "b": ["kkk:lll:mmm", "kkk"]})
+
+    # Columns left out are not split, so their lengths do not matter
+    assert len(explode_on(original, on=":", columns=["a"])) == 3
+    with pytest.raises(AssertionError, match="incompatible split lengths"):
+        explode_on(original, on=":")
+
+
 def test_apply_thesaurus():
     original = pd.DataFrame(
         {"control": ["a", "b", "c"], "test": ["Na", "dopamine", "glucosylceramide"]}
     )
     exploded = pd.DataFrame(
         {
-            "control": ["a", "a", "b", "b", "b", "c", "c"],
+            "control": ["a", "a", "a", "b", "b", "b", "c", "c"],
             "test": [
                 "Na+",
                 "cation",
+                "ion",
                 "dopamine",
                 "amine",
                 "neurotransmitter",
@@ -73,3 +111,204 @@ def test_apply_thesaurus():
     res = apply_thesaurus(original, col="test")
 
     assert res.equals(exploded)
+
+
+def test_compile_thesaurus():
+    thesaurus = pd.DataFrame(
+        {
+            "original": ["a", "b", "c", "d", "e", "a"],
+            "change_to": ["b", "c", None, "$$DROP$$", None, "e"],
+            "synonyms": [None, None, "e,d,x", None, "c", "y"],
+        }
+    )
+
+    compiled = compile_thesaurus(thesaurus)
+
+    # Chains are followed, dropped synonyms are left out, and the synonyms of
+    # each other do not recurse forever
+    assert compiled["a"] == ("c", "e", "x")
+    assert compiled["e"] == ("e", "c", "x")
+    assert compiled["d"] == ()
+
+    thesaurus.loc[2, "change_to"] = "a"
+    with pytest.raises(ValueError, match="cycle"):
+        compile_thesaurus(thesaurus)
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers={}):
+        self.status_code = status_code
+        self.reason = "Fake"
+        self.headers = headers
+        self.raw = BytesIO(body)
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, get):
+        self.get = get
+
+    def close(self):
+        pass
+
+
+def test_pbar_get_conditional(tmp_path):
+    calls = []
+
+    def fake_get(url, params, headers, stream, timeout):
+        calls.append(headers)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(304)
+        return FakeResponse(200, b"payload", {"ETag": '"v1"', "Content-Length": "7"})
+
+    set_session(FakeSession(fake_get))
+    set_download_store(tmp_path)
+    try:
+        assert pbar_get("https://example.com/file").read() == b"payload"
+        # The second request is conditional, and reuses the stored payload
+        assert pbar_get("https://example.com/file").read() == b"payload"
+    finally:
+        set_download_store(None)
+        set_session(None)
+
+    assert calls == [{}, {"If-None-Match": '"v1"'}]
+
+
+def test_pbar_get_store_cleanup(tmp_path):
+    responses = [
+        FakeResponse(200, b"payload", {"ETag": '"v1"', "Content-Length": "7"}),
+        # The file changed, and cannot be stored anymore
+        FakeResponse(200, b"new", {"Content-Length": "3"}),
+        FakeResponse(200, b"signed", {"ETag": '"v2"', "Content-Length": "6"}),
+    ]
+
+    def fake_get(url, params, headers, stream, timeout):
+        return responses.pop(0)
+
+    set_session(FakeSession(fake_get))
+    set_download_store(tmp_path)
+    try:
+        pbar_get("https://example.com/file")
+        assert len(list(tmp_path.iterdir())) == 2
+
+        # The out of date download is removed
+        assert pbar_get("https://example.com/file").read() == b"new"
+        assert list(tmp_path.iterdir()) == []
+
+        # One-time urls are not stored
+        assert pbar_get("https://example.com/signed", store=False).read() == b"signed"
+        assert list(tmp_path.iterdir()) == []
+    finally:
+        set_download_store(None)
+        set_session(None)
+
+
+class DroppingRaw(BytesIO):
+    def read(self, *args, **kwargs):
+        if self.tell() >= 4:
+            raise urllib3.exceptions.ProtocolError("Connection dropped")
+        return super().read(4)
+
+
+def test_pbar_get_resumes():
+    calls = []
+
+    def fake_get(url, params, headers, stream, timeout):
+        calls.append(headers)
+        if "Range" in headers:
+            return FakeResponse(
+                206, b"oad", {"Content-Range": "bytes 4-6/7", "Content-Length": "3"}
+            )
+        response = FakeResponse(200, headers={"ETag": '"v1"', "Content-Length": "7"})
+        response.raw = DroppingRaw(b"payload")
+        return response
+
+    set_session(FakeSession(fake_get))
+    try:
+        assert pbar_get("https://example.com/file", backoff=0).read() == b"payload"
+    finally:
+        set_session(None)
+    assert calls == [{}, {"Range": "bytes=4-", "If-Range": '"v1"'}]
+
+
+def test_pbar_get_removes_partial_downloads(tmp_path):
+    def fake_get(url, params, headers, stream, timeout):
+        if "Range" in headers:
+            return FakeResponse(404)
+        response = FakeResponse(200, headers={"ETag": '"v1"', "Content-Length": "7"})
+        response.raw = DroppingRaw(b"payload")
+        return response
+
+    set_session(FakeSession(fake_get))
+    set_download_store(tmp_path)
+    try:
+        with pytest.raises(Abort):
+            pbar_get("https://example.com/file", backoff=0)
+    finally:
+        set_download_store(None)
+        set_session(None)
+
+    assert list(tmp_path.glob("*.part")) == []
+
+
+def test_shared_session():
+    session = get_session()
+
+    assert get_session() is session
+    assert session.get_adapter("https://example.com")._pool_maxsize == HTTP_POOL_SIZE
+
+
+def test_thread_map_keeps_order():
+    def slow_square(x):
+        time.sleep(0.01 * (5 - x))
+        return x**2
+
+    assert thread_map(slow_square, range(5), max_workers=5) == [0, 1, 4, 9, 16]
+
+
+def test_payload_matches_transaction():
+    data = pd.DataFrame(
+        {
+            "name": ["a", "it's", "NA", None, np.nan],
+            "value": [1.5, np.nan, 2.0, None, np.nan],
+            "count": pd.array([1, 2, None, 4, None], dtype="Int64"),
+        }
+    )
+
+    results = []
+    for transaction in [to_transaction(data, "test"), to_payload(data, "test")]:
+        connection = sqlite3.connect(":memory:", isolation_level=None)
+        connection.execute("CREATE TABLE test (name TEXT, value REAL, count INT);")
+        execute_transaction(connection, transaction)
+        results.append(connection.execute("SELECT * FROM test;").fetchall())
+
+    assert results[0] == results[1]
+    assert len(results[1]) == 4
+
+
+def test_normalise_nulls():
+    data = pd.DataFrame(
+        {
+            "a": ["x", "NA", None, np.nan],
+            "b": [1.0, np.nan, 2.0, np.nan],
+            "c": [np.int64(1), None, "NA", pd.NA],
+        }
+    )
+
+    result = normalise_nulls(data)
+
+    # The second and last rows are all NULLs, so they are gone
+    assert result.index.tolist() == [0, 2]
+    assert result.values.tolist() == [["x", 1.0, 1], [None, 2.0, None]]
+    assert result["b"][2] == 2.0 and result["c"][2] is None
+
+
+def test_to_payloads_chunks():
+    data = pd.DataFrame({"a": range(5), "b": ["x", None, "NA", "y", "z"]})
+
+    payloads = list(to_payloads(data, "test", chunk_size=2))
+
+    assert [len(x.rows) for x in payloads] == [2, 2, 1]
+    assert [row for x in payloads for row in x.rows] == to_payload(data, "test").rows